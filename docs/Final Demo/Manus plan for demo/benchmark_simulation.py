@@ -0,0 +1,207 @@
+"""
+BleSaf Simulation Benchmarks
+Measures how both simulators and their exporters scale with customers per
+day, tellers, snapshot frequency and replications, and compares the results
+against a stored baseline
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+OUTPUT_DIR = "/home/ubuntu/blesaf_analysis"
+DAY_MINUTES = 480  # 08:00-16:00 opening hours
+
+# One dimension is varied at a time around the base case
+BASE_CASE = {"customers": 1000, "tellers": 4, "snapshot_every": 15, "replications": 1}
+SCALES = {
+    "customers": [100, 1_000, 10_000, 100_000, 1_000_000],
+    "tellers": [2, 5, 10, 20, 50],
+    "snapshot_every": [60, 15, 5, 1],
+    "replications": [1, 4, 16]
+}
+SIMULATORS = ["enhanced", "flow"]
+
+
+def _tellers(count):
+    """Teller configuration with `count` counters (demo tellers first)"""
+    from enhanced_simulation import TELLERS
+    tellers = dict(TELLERS)
+    for n in range(len(tellers) + 1, count + 1):
+        tellers[f"G{n}"] = {"name": f"Guichet {n}", "efficiency": 1.0}
+    return dict(list(tellers.items())[:count])
+
+
+def _run_enhanced(case, seed, output_dir):
+    from enhanced_simulation import EnhancedSimulator
+    from scenario import compile_scenario, run_scenario
+
+    tellers = _tellers(case["tellers"])
+    spec = {
+        "name": "benchmark",
+        "start": "2024-10-28 08:00",
+        "duration": DAY_MINUTES,
+        "tellers": [{"at": 0, "activate": t} for t in tellers],
+        "phases": [{"from": 0, "to": DAY_MINUTES - 1, "arrivals": [{"rate": case["customers"] / DAY_MINUTES, "offset": [0, 59]}]}],
+        "snapshots": [{"at": m, "label": f"t+{m}"} for m in range(0, DAY_MINUTES + 1, case["snapshot_every"])]
+    }
+    random.seed(seed)
+    sim = EnhancedSimulator(tellers=tellers)
+    start = time.perf_counter()
+    run_scenario(sim, compile_scenario(spec), verbose=False)
+    simulate_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sim.export_data(output_dir)
+    return len(sim.customers), simulate_s, time.perf_counter() - start
+
+
+def _run_flow(case, seed, output_dir):
+    from customer_flow_simulation import CustomerFlowSimulator
+
+    tellers = _tellers(case["tellers"])
+    # The flow simulator draws arrivals geometrically with per-draw probability p,
+    # which gives p / (1 - p) customers per minute on average
+    rate = case["customers"] / DAY_MINUTES
+    random.seed(seed)
+    sim = CustomerFlowSimulator(tellers=tellers, arrival_rate=rate / (1 + rate))
+    start = time.perf_counter()
+    sim.run_simulation(duration_minutes=DAY_MINUTES, snapshot_every=case["snapshot_every"], scripted=False)
+    simulate_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sim.export_data(output_dir)
+    return len(sim.customers), simulate_s, time.perf_counter() - start
+
+
+def _measure(job):
+    """Child-process entry point: run one case and report time and peak memory"""
+    simulator, case = job
+    import contextlib
+    import io
+    import resource
+
+    runner = _run_enhanced if simulator == "enhanced" else _run_flow
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    customers = simulate_s = export_s = 0
+    with tempfile.TemporaryDirectory() as output_dir, contextlib.redirect_stdout(io.StringIO()):
+        for seed in range(case["replications"]):
+            n, sim_s, exp_s = runner(case, seed, output_dir)
+            customers += n
+            simulate_s += sim_s
+            export_s += exp_s
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    scale = 1024 if sys.platform == "darwin" else 1
+
+    return {
+        "customers_total": customers,
+        "simulate_s": round(simulate_s, 4),
+        "export_s": round(export_s, 4),
+        "customers_per_s": round(customers / simulate_s, 1) if simulate_s else None,
+        "export_rows_per_s": round(customers / export_s, 1) if export_s else None,
+        "peak_rss_mb": round(rss_after / 1024 / scale, 1),
+        "run_rss_mb": round((rss_after - rss_before) / 1024 / scale, 1)
+    }
+
+
+def case_id(simulator, case):
+    return f"{simulator}/customers={case['customers']}/tellers={case['tellers']}/snapshot_every={case['snapshot_every']}/replications={case['replications']}"
+
+
+def run_benchmarks(max_customers=10_000, max_seconds=60.0, simulators=SIMULATORS, dimensions=None):
+    """Run every case in a fresh process; a dimension stops growing once a case exceeds max_seconds"""
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for simulator in simulators:
+        for dimension in dimensions or SCALES:
+            for value in SCALES[dimension]:
+                case = dict(BASE_CASE, **{dimension: value})
+                if case["customers"] > max_customers:
+                    break
+                cid = case_id(simulator, case)
+                if any(r["id"] == cid for r in results):
+                    continue  # base case already measured on another dimension
+                with context.Pool(1) as pool:
+                    metrics = pool.apply(_measure, ((simulator, case),))
+                results.append(dict(id=cid, simulator=simulator, dimension=dimension, **case, **metrics))
+                print(f"{cid}: {metrics['simulate_s']:.2f}s simulate, {metrics['export_s']:.2f}s export, "
+                      f"{metrics['customers_per_s']} customers/s, {metrics['peak_rss_mb']} MB")
+                if metrics["simulate_s"] + metrics["export_s"] > max_seconds:
+                    print(f"  {dimension}: over {max_seconds}s budget, skipping larger scales")
+                    break
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance=0.20):
+    """List cases whose throughput dropped or memory grew by more than tolerance"""
+    base = {r["id"]: r for r in baseline["cases"]}
+    regressions = []
+    for r in results:
+        b = base.get(r["id"])
+        if not b:
+            continue
+        for key, worse in (("customers_per_s", lambda cur, ref: cur < ref * (1 - tolerance)),
+                           ("export_rows_per_s", lambda cur, ref: cur < ref * (1 - tolerance)),
+                           ("peak_rss_mb", lambda cur, ref: cur > ref * (1 + tolerance))):
+            if r.get(key) and b.get(key) and worse(r[key], b[key]):
+                regressions.append({"id": r["id"], "metric": key, "baseline": b[key], "current": r[key]})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the BleSaf simulators and exporters")
+    parser.add_argument("--max-customers", type=int, default=10_000, help="largest customers/day scale to run (up to 1000000)")
+    parser.add_argument("--max-seconds", type=float, default=60.0, help="per-case time budget before larger scales are skipped")
+    parser.add_argument("--simulator", choices=SIMULATORS, action="append", help="limit to one simulator (repeatable)")
+    parser.add_argument("--dimension", choices=list(SCALES), action="append", help="limit to one dimension (repeatable)")
+    parser.add_argument("--results", default=os.path.join(OUTPUT_DIR, "benchmark_results.json"))
+    parser.add_argument("--baseline", default=os.path.join(OUTPUT_DIR, "benchmark_baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.20)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.max_customers, args.max_seconds, args.simulator or SIMULATORS, args.dimension)
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        },
+        "cases": results
+    }
+    with open(args.results, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.results}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against (run with --save-baseline)")
+        return 0
+
+    with open(args.baseline) as f:
+        regressions = compare_to_baseline(results, json.load(f), args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) vs baseline:")
+        for r in regressions:
+            print(f"- {r['id']} {r['metric']}: {r['baseline']} -> {r['current']}")
+        return 1
+    print("\nNo regressions vs baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
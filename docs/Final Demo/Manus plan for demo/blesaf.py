@@ -0,0 +1,271 @@
+"""
+BleSaf Demo Command Line
+One entry point for the simulation scripts; pandas, NumPy and matplotlib
+are only imported by the commands that need them
+
+    python blesaf.py simulate --seed 7
+    python blesaf.py export --output-dir out --fixture out/demo-data.js
+    python blesaf.py render --data-dir out --output-dir out
+    python blesaf.py sweep --axis counters=2,3,4 --axis arrival_scale=0.8,1.2 --seeds 5
+    python blesaf.py calendar 2024-10-01 2024-12-31 --counters 3 --output daily.csv
+    python blesaf.py serve --port 8766 --workers 2
+"""
+
+import argparse
+import os
+import random
+import sys
+
+OUTPUT_DIR = "/home/ubuntu/blesaf_analysis"
+
+
+def _value(text):
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def _axis(text):
+    """NAME=v1,v2,... (values) or NAME=low:high (range, for --method lhs)"""
+    name, _, spec = text.partition("=")
+    if not name or not spec:
+        raise argparse.ArgumentTypeError(f"expected NAME=v1,v2 or NAME=low:high, got {text!r}")
+    if ":" in spec:
+        low, high = spec.split(":", 1)
+        return name, (_value(low), _value(high))
+    return name, [_value(v) for v in spec.split(",")]
+
+
+def _add_run_options(parser):
+    parser.add_argument("--simulator", choices=["enhanced", "flow"], default="enhanced")
+    parser.add_argument("--scenario", help="scenario file for the enhanced simulator (default: demo_scenario.json)")
+    parser.add_argument("--config", help="calibrated config (see calibrate.py)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--snapshot-mode", choices=["full", "delta"], default="full", help="enhanced simulator only")
+    parser.add_argument("--snapshot-every", type=int, help="flow simulator: snapshot every N minutes")
+    parser.add_argument("--series", action="store_true",
+                        help="enhanced simulator: record per-minute metrics (exported as demo_series*.csv)")
+    parser.add_argument("--sla-alerts", action="store_true",
+                        help="run the online SLA breach predictor and log its alerts (see sla_predictor.py)")
+    parser.add_argument("--checkpoint", help="save a checkpoint here during the run")
+    parser.add_argument("--checkpoint-minute", type=int, help="minute to checkpoint (enhanced: 15, flow: 30)")
+    parser.add_argument("--resume", help="continue from a checkpoint instead of starting over")
+
+
+def _watch_sla(sim, args):
+    """Attach the SLA breach predictor if asked to, unless a resumed checkpoint already has one"""
+    if not args.sla_alerts:
+        return
+    from sla_predictor import SlaPredictor, attach
+    if not any(isinstance(observer, SlaPredictor) for observer in sim.observers):
+        attach(sim)
+
+
+def _simulate(args):
+    """Build, run (or resume) a simulator as described by the run options"""
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    if args.resume:
+        from simulation_checkpoint import load_checkpoint
+        sim, meta = load_checkpoint(args.resume)
+        _watch_sla(sim, args)
+        if hasattr(sim, "resume_demo_scenario"):
+            sim.resume_demo_scenario(meta)
+        else:
+            sim.run_simulation(start_minute=meta["next_minute"], snapshot_every=args.snapshot_every)
+        return sim
+
+    if args.simulator == "enhanced":
+        from enhanced_simulation import EnhancedSimulator
+        options = {"snapshot_mode": args.snapshot_mode, "record_series": args.series}
+        sim = EnhancedSimulator.from_config(args.config, **options) if args.config else EnhancedSimulator(**options)
+        _watch_sla(sim, args)
+        minute = 15 if args.checkpoint_minute is None else args.checkpoint_minute
+        sim.run_demo_scenario(args.scenario, args.checkpoint, minute)
+    else:
+        from customer_flow_simulation import CustomerFlowSimulator
+        sim = CustomerFlowSimulator.from_config(args.config) if args.config else CustomerFlowSimulator()
+        _watch_sla(sim, args)
+        minute = 30 if args.checkpoint_minute is None else args.checkpoint_minute
+        sim.run_simulation(checkpoint_minute=minute, checkpoint_path=args.checkpoint,
+                           snapshot_every=args.snapshot_every)
+    return sim
+
+
+def cmd_simulate(args):
+    sim = _simulate(args)
+    print("\n=== Snapshots ===")
+    for s in sim.full_snapshots():
+        print(f"{s['time']}  queue {s['queue_length']:>3}  served {s['total_served']:>3}  "
+              f"avg wait {s['avg_wait_time']:>5} min  SLA {s['sla_compliance']:>5}%  {s.get('label', '')}")
+    alerts = [e for e in sim.events if e["type"] == "sla_alert"]
+    if alerts:
+        print("\n=== SLA alerts ===")
+    for alert in alerts:
+        print(f"{alert['time'].strftime('%H:%M')}  {alert['status']:7}  projected SLA {alert['projected_sla']:>5}%  "
+              f"{alert['at_risk']}/{alert['queue_length']} waiting at risk, newest ticket ~{alert['newest_expected_wait']} min")
+    return 0
+
+
+def cmd_export(args):
+    sim = _simulate(args)
+    os.makedirs(args.output_dir, exist_ok=True)
+    sim.export_data(args.output_dir)
+    if args.fixture or args.fixture_json:
+        import fixture_export
+        if args.fixture:
+            fixture_export.write_demo_data_js(sim, args.fixture)
+            print(f"- {args.fixture}")
+        if args.fixture_json:
+            fixture_export.write_json_fixture({sim.wait_sketches.branch: sim}, args.fixture_json)
+            print(f"- {args.fixture_json}")
+    return 0
+
+
+def cmd_render(args):
+    from generate_demo_visualizations import render_all
+    os.makedirs(args.output_dir, exist_ok=True)
+    for path in render_all(args.data_dir, args.output_dir):
+        print(f"- {path}")
+    return 0
+
+
+def cmd_sweep(args):
+    import csv
+    from parameter_sweep import DEFAULT_CACHE_DIR, run_sweep
+
+    axes = dict(args.axis)
+    if not axes:
+        print("sweep: give at least one --axis", file=sys.stderr)
+        return 2
+    rows = run_sweep(axes, args.method, args.samples, range(args.seeds), args.scenario,
+                     args.cache_dir or DEFAULT_CACHE_DIR, args.workers)
+
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"{len(rows)} runs written to {args.output}")
+
+    # Mean over seeds per point, without pandas
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(row[name] for name in axes), []).append(row)
+    print("  ".join(list(axes) + ["sla_compliance", "avg_wait", "peak_queue"]))
+    for point, runs in groups.items():
+        means = [sum(r[m] for r in runs) / len(runs) for m in ("sla_compliance", "avg_wait", "peak_queue")]
+        print("  ".join([str(v) for v in point] + [f"{m:.1f}" for m in means]))
+    return 0
+
+
+def cmd_calendar(args):
+    import csv
+    from datetime import date
+    from calendar_simulation import DAILY_FIELDS, load_calendar, run_calendar
+
+    calendar = load_calendar(args.calendar)
+    calendar["extra_holidays"] = list(calendar["extra_holidays"]) + args.holiday
+    config = None
+    if args.config:
+        from calibrate import load_config
+        config = load_config(args.config)
+
+    output = open(args.output, "w", newline="", encoding="utf-8") if args.output else None
+    writer = csv.DictWriter(output, fieldnames=DAILY_FIELDS) if output else None
+    if writer:
+        writer.writeheader()
+    # Totals per day type, without pandas
+    totals = {}
+    try:
+        for row in run_calendar(date.fromisoformat(args.start), date.fromisoformat(args.end), calendar, config,
+                                args.counters, args.seed, args.workers):
+            if writer:
+                writer.writerow(row)
+            if row["open"]:
+                days, customers, sla = totals.get(row["day_type"], (0, 0, 0.0))
+                totals[row["day_type"]] = (days + 1, customers + row["customers"], sla + row["sla_compliance"])
+    finally:
+        if output:
+            output.close()
+            print(f"Daily aggregates written to {args.output}")
+
+    print("day_type    days  customers/day  sla_compliance")
+    for day_type, (days, customers, sla) in totals.items():
+        print(f"{day_type:10} {days:>5} {customers / days:>14.1f} {sla / days:>15.1f}")
+    return 0
+
+
+def cmd_serve(args):
+    import asyncio
+    from simulation_service import serve
+
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers, max_pending=args.max_pending))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="blesaf", description="BleSaf demo simulations")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    simulate = commands.add_parser("simulate", help="run a simulation and print its snapshots")
+    _add_run_options(simulate)
+    simulate.set_defaults(handler=cmd_simulate)
+
+    export = commands.add_parser("export", help="run a simulation and write CSV/JSON (and fixtures)")
+    _add_run_options(export)
+    export.add_argument("--output-dir", default=OUTPUT_DIR)
+    export.add_argument("--fixture", help="also write a demo-data.js here")
+    export.add_argument("--fixture-json", help="also write a JSON fixture here")
+    export.set_defaults(handler=cmd_export)
+
+    render = commands.add_parser("render", help="render the PNG charts from exported data")
+    render.add_argument("--data-dir", default=OUTPUT_DIR, help="directory with demo_snapshots.csv")
+    render.add_argument("--output-dir", default=OUTPUT_DIR)
+    render.set_defaults(handler=cmd_render)
+
+    sweep = commands.add_parser("sweep", help="run a cached parameter sweep of the demo scenario")
+    sweep.add_argument("--axis", type=_axis, action="append", default=[], metavar="NAME=V1,V2",
+                       help="counters, arrival_scale, efficiency or share:<service> (repeatable)")
+    sweep.add_argument("--method", choices=["grid", "lhs"], default="grid")
+    sweep.add_argument("--samples", type=int, default=10, help="Latin-hypercube samples")
+    sweep.add_argument("--seeds", type=int, default=1, help="replications per point")
+    sweep.add_argument("--scenario")
+    sweep.add_argument("--cache-dir")
+    sweep.add_argument("--workers", type=int)
+    sweep.add_argument("--output", help="write every run to this CSV")
+    sweep.set_defaults(handler=cmd_sweep)
+
+    calendar = commands.add_parser("calendar", help="simulate a branch day by day over a date range")
+    calendar.add_argument("start", help="first date, YYYY-MM-DD")
+    calendar.add_argument("end", help="last date, YYYY-MM-DD")
+    calendar.add_argument("--calendar", help="JSON calendar overriding the default hours, factors and holidays")
+    calendar.add_argument("--holiday", action="append", default=[], metavar="YYYY-MM-DD",
+                          help="extra holiday, e.g. Eid dates (repeatable)")
+    calendar.add_argument("--config", help="calibrated config (see calibrate.py)")
+    calendar.add_argument("--counters", type=int, help="open the first N tellers all day (default: all)")
+    calendar.add_argument("--seed", type=int, default=0)
+    calendar.add_argument("--workers", type=int)
+    calendar.add_argument("--output", help="write the daily aggregates to this CSV")
+    calendar.set_defaults(handler=cmd_calendar)
+
+    serve = commands.add_parser("serve", help="run the local HTTP simulation service for the apps and dashboards")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8766)
+    serve.add_argument("--workers", type=int, help="pool processes (default: half the CPUs)")
+    serve.add_argument("--max-pending", type=int, default=32, help="queued pool jobs before answering 503")
+    serve.set_defaults(handler=cmd_serve)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
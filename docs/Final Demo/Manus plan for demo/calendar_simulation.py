@@ -0,0 +1,276 @@
+"""
+BleSaf Calendar Simulation
+Simulates a branch day by day over weeks or months: opening hours, weekday
+and month-end salary peaks, Tunisian public holidays. Days are independent,
+so they run in parallel processes, and daily aggregates stream out in date
+order as they complete
+
+    python calendar_simulation.py 2024-10-01 2024-12-31 -o daily.csv
+"""
+
+import argparse
+import copy
+import csv
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+DRAIN_LIMIT = 240  # minutes after closing to serve the customers already inside
+
+# Intraday arrivals (customers per minute, 30-minute buckets) of an average
+# weekday; same shape as calibrate.fit_arrival_profile, which replaces it
+DEFAULT_PROFILE = {
+    "bucket_minutes": 30,
+    "rates": {
+        "07:30": 0.3, "08:00": 0.3, "08:30": 0.4, "09:00": 0.5, "09:30": 0.5,
+        "10:00": 0.5, "10:30": 0.45, "11:00": 0.4, "11:30": 0.4, "12:00": 0.45,
+        "12:30": 0.5, "13:00": 0.4, "13:30": 0.35, "14:00": 0.35, "14:30": 0.3,
+        "15:00": 0.3, "15:30": 0.2
+    }
+}
+
+DEFAULT_CALENDAR = {
+    "hours": ["08:00", "16:00"],
+    # Summer single session ("seance unique")
+    "summer": {"from": "07-01", "to": "08-31", "hours": ["07:30", "13:30"]},
+    # Monday .. Sunday demand factors; 0 = closed
+    "weekday_factors": [1.25, 1.0, 0.95, 1.0, 0.9, 0, 0],
+    # Salary peak over the last and first business days of each month
+    "month_end": {"last_days": 3, "first_days": 2, "factor": 1.4},
+    # Fixed-date public holidays (MM-DD). Religious holidays follow the lunar
+    # calendar and move every year: pass them as dates in "extra_holidays".
+    "holidays": ["01-01", "03-20", "04-09", "05-01", "07-25", "08-13", "10-15", "12-17"],
+    "extra_holidays": []
+}
+
+DAILY_FIELDS = ["date", "weekday", "day_type", "factor", "open", "close", "customers", "served",
+                "avg_wait", "wait_p50", "wait_p90", "sla_compliance", "peak_queue", "utilization",
+                "overtime_minutes"]
+
+
+def load_calendar(path: str = None) -> dict:
+    """DEFAULT_CALENDAR, with the keys of a JSON calendar file overriding it"""
+    calendar = copy.deepcopy(DEFAULT_CALENDAR)
+    if path:
+        with open(path, encoding="utf-8") as f:
+            calendar.update(json.load(f))
+    return calendar
+
+
+def _minutes(hhmm: str) -> int:
+    hours, minutes = map(int, hhmm.split(":"))
+    return hours * 60 + minutes
+
+
+def _is_closed(day: date, calendar: dict) -> bool:
+    return (calendar["weekday_factors"][day.weekday()] == 0
+            or day.strftime("%m-%d") in calendar["holidays"]
+            or day.isoformat() in calendar["extra_holidays"])
+
+
+def _business_days_of_month(day: date, calendar: dict) -> list:
+    first = day.replace(day=1)
+    following = (first + timedelta(days=32)).replace(day=1)
+    return [first + timedelta(days=i) for i in range((following - first).days)
+            if not _is_closed(first + timedelta(days=i), calendar)]
+
+
+def day_plan(day: date, calendar: dict) -> dict:
+    """Opening hours and demand factor of one date"""
+    plan = {"date": day.isoformat(), "weekday": day.strftime("%a"), "factor": 0.0, "open": None, "close": None}
+    if calendar["weekday_factors"][day.weekday()] == 0:
+        return dict(plan, day_type="weekend")
+    if _is_closed(day, calendar):
+        return dict(plan, day_type="holiday")
+
+    hours = calendar["hours"]
+    summer = calendar.get("summer")
+    if summer and summer["from"] <= day.strftime("%m-%d") <= summer["to"]:
+        hours = summer["hours"]
+
+    factor = calendar["weekday_factors"][day.weekday()]
+    day_type = "weekday"
+    month_end = calendar.get("month_end")
+    if month_end:
+        business = _business_days_of_month(day, calendar)
+        position = business.index(day)
+        if position < month_end["first_days"] or position >= len(business) - month_end["last_days"]:
+            factor *= month_end["factor"]
+            day_type = "month_end"
+    return dict(plan, day_type=day_type, factor=round(factor, 3), open=hours[0], close=hours[1])
+
+
+def iter_days(start: date, end: date, calendar: dict):
+    """day_plan() of every date from start to end inclusive"""
+    for i in range((end - start).days + 1):
+        yield day_plan(start + timedelta(days=i), calendar)
+
+
+@lru_cache(maxsize=64)
+def _day_schedule(open_minute: int, duration: int, factor: float, counters: tuple, profile_json: str, services_json: str):
+    """Compiled schedule of a kind of day, shared by every date with the same hours and factor"""
+    from calibrate import arrival_phases
+    from scenario import compile_scenario
+
+    spec = {
+        "name": "calendar day",
+        "start": "2000-01-01 00:00",  # replaced by the actual date
+        "duration": duration,
+        "tellers": [{"at": 0, "activate": teller_id} for teller_id in counters],
+        "phases": arrival_phases(json.loads(profile_json), open_minute, duration, factor)
+    }
+    return compile_scenario(spec, json.loads(services_json))
+
+
+def _run_day(job):
+    """Worker: simulate one open day and return its aggregates"""
+    plan, config, seed = job
+    from enhanced_simulation import EnhancedSimulator
+    from scenario import run_scenario
+
+    open_minute = _minutes(plan["open"])
+    duration = _minutes(plan["close"]) - open_minute
+    schedule = copy.copy(_day_schedule(open_minute, duration, plan["factor"], tuple(config["counters"]),
+                                       config["profile_json"], config["services_json"]))
+    schedule.start = datetime.fromisoformat(plan["date"]) + timedelta(minutes=open_minute)
+
+    # Seeded per date, so results do not depend on how days are spread over workers
+    random.seed(seed * 1_000_003 + date.fromisoformat(plan["date"]).toordinal())
+    sim = EnhancedSimulator(config["services"], config["tellers"])
+    peak = [0]
+
+    def track_peak(sim, minute):
+        peak[0] = max(peak[0], len(sim.queue))
+
+    minute = run_scenario(sim, schedule, end_minute=duration - 1, verbose=False, on_minute=track_peak)
+    # Doors close; customers already inside are still served
+    while (sim.queue or any(t["current_customer"] for t in sim.active_tellers.values())) \
+            and minute < duration + DRAIN_LIMIT:
+        minute = run_scenario(sim, schedule, start_minute=minute, end_minute=minute, verbose=False,
+                              on_minute=track_peak)
+
+    served = len(sim.served)
+    percentiles = sim.wait_sketches.percentiles()
+    busy = sum(c["service_duration"] for c in sim.served)
+    return dict(
+        plan,
+        customers=len(sim.customers),
+        served=served,
+        avg_wait=round(sim.wait_total / served, 1) if served else 0,
+        wait_p50=round(percentiles["p50"] or 0, 1),
+        wait_p90=round(percentiles["p90"] or 0, 1),
+        sla_compliance=round(100 * sim.sla_met / served, 1) if served else 100,
+        peak_queue=peak[0],
+        utilization=round(100 * busy / (len(config["counters"]) * max(minute, 1)), 1),
+        overtime_minutes=max(0, minute - duration)
+    ), sim.wait_sketches.get("branch").to_dict()
+
+
+def run_calendar(start: date, end: date, calendar: dict = None, config: dict = None, counters: int = None,
+                 seed: int = 0, workers: int = None, sketch=None):
+    """Yield daily aggregates from start to end, in date order, as days complete
+
+    config is a calibrated config (services, tellers, arrival_profile; see
+    calibrate.py) and defaults to the demo branch; counters opens the first N
+    tellers all day. Closed days are yielded too, with zero customers. Pass
+    a quantile_sketch.QuantileSketch as sketch to collect every served wait
+    of the period.
+    """
+    from enhanced_simulation import SERVICES, TELLERS
+    from quantile_sketch import QuantileSketch
+
+    calendar = calendar or load_calendar()
+    config = config or {}
+    services = config.get("services", SERVICES)
+    tellers = config.get("tellers", TELLERS)
+    worker_config = {
+        "services": services,
+        "tellers": tellers,
+        "counters": list(tellers)[:counters] if counters else list(tellers),
+        "profile_json": json.dumps(config.get("arrival_profile", DEFAULT_PROFILE), sort_keys=True),
+        "services_json": json.dumps(services, sort_keys=True, ensure_ascii=False)
+    }
+
+    plans = list(iter_days(start, end, calendar))
+    jobs = [(plan, worker_config, seed) for plan in plans if plan["open"]]
+    if workers == 1:
+        results = map(_run_day, jobs)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_run_day, jobs, chunksize=max(1, len(jobs) // (4 * (workers or os.cpu_count()))))
+
+    try:
+        for plan in plans:
+            if not plan["open"]:
+                yield dict(plan, customers=0, served=0, avg_wait=0, wait_p50=0, wait_p90=0, sla_compliance=None,
+                           peak_queue=0, utilization=0, overtime_minutes=0)
+                continue
+            row, day_sketch = next(results)
+            if sketch is not None:
+                sketch.merge(QuantileSketch.from_dict(day_sketch))
+            yield row
+    finally:
+        if workers != 1:
+            executor.shutdown(cancel_futures=True)
+
+
+def _parse_date(text):
+    return date.fromisoformat(text)
+
+
+if __name__ == "__main__":
+    import time
+
+    from quantile_sketch import QuantileSketch
+
+    parser = argparse.ArgumentParser(description="Simulate a branch over a calendar period, one process per day")
+    parser.add_argument("start", type=_parse_date, help="first date, YYYY-MM-DD")
+    parser.add_argument("end", type=_parse_date, help="last date, YYYY-MM-DD")
+    parser.add_argument("-o", "--output", help="write the daily aggregates to this CSV as they arrive")
+    parser.add_argument("--calendar", help="JSON calendar overriding DEFAULT_CALENDAR keys")
+    parser.add_argument("--holiday", action="append", default=[], metavar="YYYY-MM-DD",
+                        help="extra holiday, e.g. Eid dates (repeatable)")
+    parser.add_argument("--config", help="calibrated config (see calibrate.py)")
+    parser.add_argument("--counters", type=int, help="open the first N tellers all day (default: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    calendar = load_calendar(args.calendar)
+    calendar["extra_holidays"] = list(calendar["extra_holidays"]) + args.holiday
+    config = None
+    if args.config:
+        from calibrate import load_config
+        config = load_config(args.config)
+
+    started = time.perf_counter()
+    period = QuantileSketch()
+    output = open(args.output, "w", newline="", encoding="utf-8") if args.output else None
+    writer = csv.DictWriter(output, fieldnames=DAILY_FIELDS) if output else None
+    if writer:
+        writer.writeheader()
+
+    open_days = customers = 0
+    try:
+        for row in run_calendar(args.start, args.end, calendar, config, args.counters, args.seed, args.workers, period):
+            if writer:
+                writer.writerow(row)
+                output.flush()
+            if row["open"]:
+                open_days += 1
+                customers += row["customers"]
+                print(f"{row['date']} {row['weekday']} {row['day_type']:9} x{row['factor']:<5} "
+                      f"{row['customers']:>4} customers  avg wait {row['avg_wait']:>5} min  "
+                      f"SLA {row['sla_compliance']:>5}%  peak queue {row['peak_queue']:>3}")
+            else:
+                print(f"{row['date']} {row['weekday']} {row['day_type']}")
+    finally:
+        if output:
+            output.close()
+
+    print(f"\n{open_days} open days, {customers} customers in {time.perf_counter() - started:.2f}s")
+    if period.count:
+        print(f"Period waits: P50 {period.quantile(0.5):.1f} min, P90 {period.quantile(0.9):.1f} min")
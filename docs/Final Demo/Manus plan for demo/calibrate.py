@@ -0,0 +1,222 @@
+"""
+BleSaf Calibration
+Fits service durations, teller efficiency and time-of-day arrival profiles
+from demo_customers.csv-shaped history and writes a config both simulators
+load directly (EnhancedSimulator.from_config / CustomerFlowSimulator.from_config)
+"""
+
+import glob
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+BUCKET_MINUTES = 15
+EFFICIENCY_ITERATIONS = 10
+
+# Column names of the two exporters (enhanced_simulation / customer_flow_simulation)
+COLUMN_ALIASES = {"Arrival Time": "Arrival"}
+CATEGORIES = ("Date", "Branch", "Service", "Teller", "Status")
+TIMES = ("Arrival", "Service Start", "Service End")
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401  optional, faster CSV parsing
+        return True
+    except ImportError:
+        return False
+
+
+def clock_seconds(values: pd.Series) -> np.ndarray:
+    """Vectorized HH:MM:SS -> seconds since midnight, NaN when missing"""
+    raw = values.fillna("").astype(str).to_numpy().astype("S8")
+    digits = raw.view(np.uint8).reshape(-1, 8).astype(np.int32) - 48
+    seconds = (digits[:, 0] * 10 + digits[:, 1]) * 3600 + (digits[:, 3] * 10 + digits[:, 4]) * 60 \
+        + digits[:, 6] * 10 + digits[:, 7]
+    valid = raw.view(np.uint8).reshape(-1, 8)[:, 2] == ord(":")
+    return np.where(valid, seconds, np.nan)
+
+
+def load_history(paths) -> pd.DataFrame:
+    """Read one or more customer exports into one frame with numeric times
+
+    Files may carry Date and Branch columns; without them every file counts as
+    one day of a single branch.
+    """
+    if isinstance(paths, str):
+        paths = sorted(glob.glob(paths)) or [paths]
+    wanted = set(CATEGORIES) | set(TIMES) | {a for a, c in COLUMN_ALIASES.items() if c in TIMES}
+    dtypes = {c: "category" for c in CATEGORIES}
+    dtypes.update({c: str for c in wanted if c not in CATEGORIES})
+    options = {"engine": "pyarrow"} if _has_pyarrow() else {}
+
+    frames = []
+    for day, path in enumerate(paths):
+        df = pd.read_csv(path, usecols=lambda c: c in wanted, dtype=dtypes, **options)
+        df = df.rename(columns=COLUMN_ALIASES)
+        if "Date" not in df:
+            df["Date"] = pd.Categorical([str(day)] * len(df))
+        if "Branch" not in df:
+            df["Branch"] = pd.Categorical(["default"] * len(df))
+        frames.append(df)
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    # Files with different category sets concatenate to object columns
+    for column in CATEGORIES:
+        if df[column].dtype != "category":
+            df[column] = df[column].astype("category")
+    df["arrival_s"] = clock_seconds(df["Arrival"])
+    df["start_s"] = clock_seconds(df["Service Start"])
+    end = clock_seconds(df["Service End"])
+    # Services running past midnight
+    df["end_s"] = np.where(end < df["start_s"], end + 86400, end)
+    return df.drop(columns=["Arrival", "Service Start", "Service End"])
+
+
+def fit_durations(df: pd.DataFrame):
+    """Per-service base duration and per-teller efficiency
+
+    Observed duration = base duration of the service / teller efficiency, so
+    the two are fitted jointly by alternating ratio estimates (vectorized
+    with bincount over category codes) and efficiencies are normalized to a
+    customer-weighted mean of 1.
+    """
+    done = df[(df["Status"] == "completed") & (df["end_s"] > df["start_s"])]
+    duration = ((done["end_s"] - done["start_s"]) / 60).to_numpy()
+    service = done["Service"].cat.codes.to_numpy()
+    teller = done["Teller"].cat.codes.to_numpy()
+    n_services = len(done["Service"].cat.categories)
+    n_tellers = len(done["Teller"].cat.categories)
+
+    service_count = np.bincount(service, minlength=n_services)
+    teller_count = np.bincount(teller, minlength=n_tellers)
+    efficiency = np.ones(n_tellers)
+    for _ in range(EFFICIENCY_ITERATIONS):
+        base = np.bincount(service, duration * efficiency[teller], n_services) / np.maximum(service_count, 1)
+        efficiency = np.bincount(teller, base[service], n_tellers) / np.maximum(np.bincount(teller, duration, n_tellers), 1e-9)
+        efficiency /= np.average(efficiency, weights=np.maximum(teller_count, 1))
+
+    normalized = duration * efficiency[teller]
+    base = np.bincount(service, normalized, n_services) / np.maximum(service_count, 1)
+    variance = np.bincount(service, (normalized - base[service]) ** 2, n_services) / np.maximum(service_count - 1, 1)
+
+    services = {
+        name: {"count": int(service_count[i]), "mean": float(base[i]), "std": float(math.sqrt(variance[i]))}
+        for i, name in enumerate(done["Service"].cat.categories) if service_count[i]
+    }
+    tellers = {
+        str(name): {"count": int(teller_count[i]), "efficiency": round(float(efficiency[i]), 3)}
+        for i, name in enumerate(done["Teller"].cat.categories) if teller_count[i]
+    }
+    return services, tellers
+
+
+def fit_arrival_profile(df: pd.DataFrame, bucket_minutes: int = BUCKET_MINUTES) -> dict:
+    """Mean arrivals per minute in each time-of-day bucket, averaged over branch-days"""
+    arrivals = df[~np.isnan(df["arrival_s"])]
+    bucket = (arrivals["arrival_s"].to_numpy() // (bucket_minutes * 60)).astype(np.int64)
+    days = arrivals.groupby(["Branch", "Date"], observed=True).ngroups
+    counts = np.bincount(bucket, minlength=24 * 60 // bucket_minutes)
+    rates = {}
+    for b in np.flatnonzero(counts):
+        start = int(b) * bucket_minutes
+        rates[f"{start // 60:02d}:{start % 60:02d}"] = round(counts[b] / days / bucket_minutes, 4)
+    return {"bucket_minutes": bucket_minutes, "days": days, "rates": rates}
+
+
+def calibrate(paths, bucket_minutes: int = BUCKET_MINUTES) -> dict:
+    """Fit a full simulator config from customer history"""
+    from enhanced_simulation import SERVICES, TELLERS
+
+    df = load_history(paths)
+    services_fit, tellers_fit = fit_durations(df)
+    shares = df["Service"].value_counts(normalize=True)
+
+    services = {}
+    for name, fit in services_fit.items():
+        mean, std = fit["mean"], fit["std"]
+        # Uniform integer range with the same mean and spread, for EnhancedSimulator
+        half_width = math.sqrt(3) * std
+        services[name] = {
+            "avg_duration": round(mean, 2),
+            "std_dev": round(std, 2),
+            "frequency": round(float(shares.get(name, 0)), 4),
+            "duration": [max(1, int(round(mean - half_width))), max(1, int(round(mean + half_width)))],
+            "weight": round(float(shares.get(name, 0)), 4),
+            "prefix": SERVICES[name]["prefix"] if name in SERVICES else name[0].upper(),
+            "samples": fit["count"]
+        }
+
+    tellers = {}
+    for teller_id, fit in tellers_fit.items():
+        known = TELLERS.get(teller_id)
+        tellers[teller_id] = {
+            "name": known["name"] if known else teller_id,
+            "efficiency": fit["efficiency"],
+            "samples": fit["count"]
+        }
+
+    return {
+        "source": {
+            "rows": len(df),
+            "branches": int(df["Branch"].nunique()),
+            "days": int(df.groupby(["Branch", "Date"], observed=True).ngroups)
+        },
+        "services": services,
+        "tellers": tellers,
+        "arrival_profile": fit_arrival_profile(df, bucket_minutes)
+    }
+
+
+def load_config(path: str) -> dict:
+    """Read a calibrated config in the shapes the simulators expect"""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    for service in config["services"].values():
+        service["duration"] = tuple(service["duration"])
+    return config
+
+
+def arrival_phases(profile: dict, start_minute_of_day: int, duration: int, scale: float = 1.0) -> list:
+    """Scenario phases (Poisson rates) following a calibrated arrival profile
+
+    start_minute_of_day is the scenario's start time in minutes since midnight.
+    """
+    bucket = profile["bucket_minutes"]
+    phases = []
+    minute = 0
+    while minute < duration:
+        time_of_day = start_minute_of_day + minute
+        bucket_start = time_of_day // bucket * bucket
+        end = min(duration - 1, minute + bucket_start + bucket - time_of_day - 1)
+        rate = profile["rates"].get(f"{bucket_start // 60:02d}:{bucket_start % 60:02d}", 0) * scale
+        if rate > 0:
+            phases.append({"from": minute, "to": end, "arrivals": [{"rate": rate, "offset": [0, 59]}]})
+        minute = end + 1
+    return phases
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Calibrate simulator parameters from customer exports")
+    parser.add_argument("history", nargs="+", help="customer CSV files or glob patterns")
+    parser.add_argument("-o", "--output", default="calibrated_config.json")
+    parser.add_argument("--bucket-minutes", type=int, default=BUCKET_MINUTES)
+    args = parser.parse_args()
+
+    paths = [p for pattern in args.history for p in (sorted(glob.glob(pattern)) or [pattern])]
+    start = time.perf_counter()
+    config = calibrate(paths, args.bucket_minutes)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2, ensure_ascii=False)
+
+    print(f"Calibrated from {config['source']['rows']} rows "
+          f"({config['source']['branches']} branches, {config['source']['days']} days) "
+          f"in {time.perf_counter() - start:.2f}s -> {args.output}")
+    for name, s in config["services"].items():
+        print(f"- {name}: {s['avg_duration']} +/- {s['std_dev']} min, share {s['weight']:.0%}")
+    for teller_id, t in config["tellers"].items():
+        print(f"- {teller_id}: efficiency {t['efficiency']}")
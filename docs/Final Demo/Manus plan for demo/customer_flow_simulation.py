@@ -5,14 +5,16 @@ Generates realistic demo data for a 30-minute presentation
 
 import random
 import json
+import os
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
-import pandas as pd
+from typing import Dict
+from simulation_core import BranchSimulator
 
 # Configuration
 SIMULATION_START_TIME = datetime.strptime("2024-10-26 13:45", "%Y-%m-%d %H:%M")
 SIMULATION_DURATION_MINUTES = 120  # 2 hours of data
 BRANCH_NAME = "Agence Lac 2"
+OUTPUT_DIR = "/home/ubuntu/blesaf_analysis"
 
 # Service types with average duration and frequency
 SERVICES = {
@@ -54,31 +56,43 @@ CUSTOMER_LAST_NAMES = [
     "Mansour", "Sassi", "Khedher", "Mejri", "Dridi", "Chouchane", "Ayari"
 ]
 
-class CustomerFlowSimulator:
-    def __init__(self):
-        self.current_time = SIMULATION_START_TIME
-        self.customers = []
-        self.ticket_counter = {"D": 1, "R": 1, "C": 1, "V": 1, "A": 1}
-        self.active_tellers = []
-        self.queue = []
-        self.served_customers = []
-        self.events = []
-        
-    def generate_customer_name(self) -> str:
-        """Generate a random Tunisian customer name"""
-        first = random.choice(CUSTOMER_FIRST_NAMES)
-        last = random.choice(CUSTOMER_LAST_NAMES)
-        return f"{first} {last}"
+class CustomerFlowSimulator(BranchSimulator):
+    """Self-scripted two-hour front-end over the shared branch engine"""
+    
+    first_names = CUSTOMER_FIRST_NAMES
+    last_names = CUSTOMER_LAST_NAMES
+    default_prefixes = COUNTER_PREFIXES
     
-    def generate_ticket_number(self, service: str) -> str:
-        """Generate ticket number based on service type"""
-        prefix = COUNTER_PREFIXES[service]
-        number = self.ticket_counter[prefix]
-        self.ticket_counter[prefix] += 1
-        return f"{prefix}-{number:03d}"
+    def __init__(self, tellers=None, arrival_rate: float = None,
+                 services: Dict = None, arrival_profile: Dict = None):
+        # Defaults to the demo configuration; a fixed arrival_rate or a
+        # calibrated arrival_profile replaces the built-in time-of-day rates
+        super().__init__(services or SERVICES, tellers or TELLERS, SIMULATION_START_TIME, BRANCH_NAME)
+        self.arrival_rate = arrival_rate
+        self.arrival_profile = arrival_profile
+    
+    @classmethod
+    def from_config(cls, path: str, **kwargs) -> "CustomerFlowSimulator":
+        """Build a simulator from a calibrated config (see calibrate.py)"""
+        from calibrate import load_config
+        config = load_config(path)
+        return cls(tellers=config["tellers"], services=config["services"],
+                   arrival_profile=config.get("arrival_profile"), **kwargs)
     
     def calculate_arrival_rate(self, current_minute: int) -> float:
         """Calculate customer arrival rate based on time of day"""
+        if self.arrival_rate is not None:
+            return self.arrival_rate
+        
+        if self.arrival_profile:
+            # Calibrated profile: expected arrivals per minute for each time-of-day
+            # bucket, turned into the per-draw probability of simulate_arrivals
+            bucket = self.arrival_profile["bucket_minutes"]
+            time_of_day = SIMULATION_START_TIME + timedelta(minutes=current_minute)
+            start = (time_of_day.hour * 60 + time_of_day.minute) // bucket * bucket
+            rate = self.arrival_profile["rates"].get(f"{start // 60:02d}:{start % 60:02d}", 0)
+            return rate / (1 + rate)
+        
         # Peak hours: 14:00-15:00 (higher arrival rate)
         # Off-peak: 13:45-14:00 and 15:00-16:00 (lower rate)
         hour = (current_minute // 60) + 13
@@ -95,228 +109,74 @@ class CustomerFlowSimulator:
         """Select service type based on frequency distribution"""
         rand = random.random()
         cumulative = 0
-        for service, props in SERVICES.items():
+        for service, props in self.services.items():
             cumulative += props["frequency"]
             if rand <= cumulative:
                 return service
-        return "Autres"
+        return service
+    
+    def draw_duration(self, service: str) -> float:
+        return random.gauss(self.services[service]["avg_duration"], self.services[service]["std_dev"])
     
-    def calculate_service_duration(self, service: str, teller_efficiency: float) -> int:
-        """Calculate service duration with randomness and teller efficiency"""
-        avg = SERVICES[service]["avg_duration"]
-        std = SERVICES[service]["std_dev"]
-        duration = max(1, int(random.gauss(avg, std) / teller_efficiency))
-        return duration
+    def service_duration(self, customer: Dict, teller: Dict) -> int:
+        """Whole minutes, at least one"""
+        return max(1, int(super().service_duration(customer, teller)))
     
     def simulate_arrivals(self, minute: int):
         """Simulate customer arrivals for a given minute"""
         arrival_rate = self.calculate_arrival_rate(minute)
         
         # Multiple customers can arrive in the same minute
-        num_arrivals = 0
         while random.random() < arrival_rate:
-            num_arrivals += 1
             service = self.select_service()
-            customer = {
-                "id": len(self.customers) + 1,
-                "name": self.generate_customer_name(),
-                "ticket": self.generate_ticket_number(service),
-                "service": service,
-                "arrival_time": self.current_time + timedelta(seconds=random.randint(0, 59)),
-                "status": "waiting",
-                "wait_time": 0,
-                "service_duration": None,
-                "teller_id": None,
-                "teller_name": None,
-                "service_start": None,
-                "service_end": None
-            }
-            self.customers.append(customer)
-            self.queue.append(customer)
-            
-            # Log event
-            self.events.append({
-                "time": customer["arrival_time"],
-                "type": "arrival",
-                "customer_id": customer["id"],
-                "ticket": customer["ticket"],
-                "service": service,
-                "queue_length": len(self.queue)
-            })
-    
-    def assign_customers_to_tellers(self):
-        """Assign waiting customers to available tellers"""
-        for teller in self.active_tellers:
-            if teller["current_customer"] is None and len(self.queue) > 0:
-                # Find next customer that can be served by this teller
-                # (In real system, counters can be configured for specific services)
-                customer = self.queue.pop(0)
-                
-                # Calculate service duration
-                duration = self.calculate_service_duration(
-                    customer["service"],
-                    teller["efficiency"]
-                )
-                
-                customer["status"] = "being_served"
-                customer["service_start"] = self.current_time
-                customer["service_end"] = self.current_time + timedelta(minutes=duration)
-                customer["service_duration"] = duration
-                customer["teller_id"] = teller["id"]
-                customer["teller_name"] = teller["name"]
-                customer["wait_time"] = (customer["service_start"] - customer["arrival_time"]).total_seconds() / 60
-                
-                teller["current_customer"] = customer
-                teller["service_end_time"] = customer["service_end"]
-                
-                # Log event
-                self.events.append({
-                    "time": self.current_time,
-                    "type": "service_start",
-                    "customer_id": customer["id"],
-                    "ticket": customer["ticket"],
-                    "teller_id": teller["id"],
-                    "teller_name": teller["name"],
-                    "wait_time": round(customer["wait_time"], 2),
-                    "queue_length": len(self.queue)
-                })
-    
-    def complete_services(self):
-        """Complete services for customers whose service time has ended"""
-        for teller in self.active_tellers:
-            if teller["current_customer"] is not None:
-                if self.current_time >= teller["service_end_time"]:
-                    customer = teller["current_customer"]
-                    customer["status"] = "completed"
-                    self.served_customers.append(customer)
-                    
-                    # Log event
-                    self.events.append({
-                        "time": self.current_time,
-                        "type": "service_complete",
-                        "customer_id": customer["id"],
-                        "ticket": customer["ticket"],
-                        "teller_id": teller["id"],
-                        "service_duration": customer["service_duration"],
-                        "total_time": round((customer["service_end"] - customer["arrival_time"]).total_seconds() / 60, 2)
-                    })
-                    
-                    # Free up teller
-                    teller["current_customer"] = None
-                    teller["service_end_time"] = None
-                    teller["customers_served"] += 1
+            name = self.random_name()
+            self.add_customer(service, random.randint(0, 59), name=name)
     
     def update_queue_wait_times(self):
         """Update wait times for customers in queue"""
         for customer in self.queue:
             customer["wait_time"] = (self.current_time - customer["arrival_time"]).total_seconds() / 60
     
-    def activate_teller(self, teller_id: str):
-        """Activate a teller"""
-        teller_info = next(t for t in TELLERS if t["id"] == teller_id)
-        teller = {
-            "id": teller_info["id"],
-            "name": teller_info["name"],
-            "efficiency": teller_info["efficiency"],
-            "status": "active",
-            "current_customer": None,
-            "service_end_time": None,
-            "customers_served": 0,
-            "activation_time": self.current_time
-        }
-        self.active_tellers.append(teller)
-        
-        self.events.append({
-            "time": self.current_time,
-            "type": "teller_activated",
-            "teller_id": teller_id,
-            "teller_name": teller_info["name"]
-        })
-    
-    def deactivate_teller(self, teller_id: str):
-        """Deactivate a teller (for breaks)"""
-        teller = next((t for t in self.active_tellers if t["id"] == teller_id), None)
-        if teller and teller["current_customer"] is None:
-            self.active_tellers.remove(teller)
-            
-            self.events.append({
-                "time": self.current_time,
-                "type": "teller_deactivated",
-                "teller_id": teller_id,
-                "reason": "break"
-            })
-            return True
-        return False
+    def waiting_wait(self, customer: Dict) -> float:
+        # As of the last update_queue_wait_times(), like the rest of this simulator's state
+        return customer["wait_time"]
     
     def get_current_state(self) -> Dict:
         """Get current state of the branch"""
-        waiting_customers = [c for c in self.customers if c["status"] == "waiting"]
-        being_served = [c for c in self.customers if c["status"] == "being_served"]
-        
-        # Calculate average wait time
-        if self.served_customers:
-            avg_wait = sum(c["wait_time"] for c in self.served_customers) / len(self.served_customers)
-        else:
-            avg_wait = 0
+        state = self.current_state()
+        del state["label"]
+        state["waiting_customers"] = state["waiting_customers"][:10]  # Top 10
+        for teller in state["active_tellers"]:
+            teller["customers_served"] = teller.pop("total_served")
+        return state
+    
+    def run_simulation(self, start_minute: int = 0, checkpoint_minute: int = None,
+                       checkpoint_path: str = None, duration_minutes: int = SIMULATION_DURATION_MINUTES,
+                       snapshot_every: int = None, scripted: bool = True):
+        """Run the complete simulation (or resume it from start_minute)
         
-        # Calculate SLA compliance (15 min threshold)
-        if self.served_customers:
-            sla_compliant = sum(1 for c in self.served_customers if c["wait_time"] <= 15)
-            sla_percentage = (sla_compliant / len(self.served_customers)) * 100
+        If checkpoint_minute and checkpoint_path are given, a checkpoint is
+        written once that minute has been fully processed; resume it with
+        load_checkpoint() and run_simulation(start_minute=meta["next_minute"]).
+        With scripted=False every configured teller works the whole run instead
+        of following the demo's activations and breaks; snapshot_every records
+        get_current_state() into self.snapshots every N minutes.
+        """
+        if start_minute == 0:
+            print(f"Starting simulation at {SIMULATION_START_TIME.strftime('%H:%M')}")
+            
+            # Initial setup: Activate 2 tellers (or all of them when unscripted)
+            for teller_id in (list(self.tellers)[:2] if scripted else self.tellers):
+                self.activate_teller(teller_id)
         else:
-            sla_percentage = 100
-        
-        # Service breakdown
-        service_breakdown = {}
-        for service in SERVICES.keys():
-            service_customers = [c for c in waiting_customers if c["service"] == service]
-            if service_customers:
-                avg_wait_service = sum(c["wait_time"] for c in service_customers) / len(service_customers)
-                service_breakdown[service] = {
-                    "count": len(service_customers),
-                    "avg_wait": round(avg_wait_service, 1)
-                }
-        
-        return {
-            "time": self.current_time.strftime("%H:%M"),
-            "queue_length": len(waiting_customers),
-            "being_served": len(being_served),
-            "total_served": len(self.served_customers),
-            "active_counters": len(self.active_tellers),
-            "avg_wait_time": round(avg_wait, 1),
-            "sla_compliance": round(sla_percentage, 1),
-            "waiting_customers": [
-                {
-                    "ticket": c["ticket"],
-                    "name": c["name"],
-                    "service": c["service"],
-                    "wait_time": round(c["wait_time"], 1)
-                }
-                for c in waiting_customers[:10]  # Top 10
-            ],
-            "active_tellers": [
-                {
-                    "id": t["id"],
-                    "name": t["name"],
-                    "status": "busy" if t["current_customer"] else "available",
-                    "current_ticket": t["current_customer"]["ticket"] if t["current_customer"] else None,
-                    "customers_served": t["customers_served"]
-                }
-                for t in self.active_tellers
-            ],
-            "service_breakdown": service_breakdown
-        }
-    
-    def run_simulation(self):
-        """Run the complete simulation"""
-        print(f"Starting simulation at {SIMULATION_START_TIME.strftime('%H:%M')}")
+            resume_time = SIMULATION_START_TIME + timedelta(minutes=start_minute)
+            print(f"Resuming simulation at {resume_time.strftime('%H:%M')}")
         
-        # Initial setup: Activate 2 tellers
-        self.activate_teller("G1")
-        self.activate_teller("G2")
+        # The demo script's three counters, by position so calibrated teller IDs work too
+        first, second, third = (list(self.tellers) + [None] * 3)[:3]
         
         # Simulate minute by minute
-        for minute in range(SIMULATION_DURATION_MINUTES):
+        for minute in range(start_minute, duration_minutes):
             self.current_time = SIMULATION_START_TIME + timedelta(minutes=minute)
             
             # Process in order:
@@ -327,34 +187,45 @@ class CustomerFlowSimulator:
             self.simulate_arrivals(minute)
             
             # 3. Assign customers to available tellers
-            self.assign_customers_to_tellers()
+            self.assign_customers()
             
             # 4. Update wait times
             self.update_queue_wait_times()
             
-            # Demo-specific events (to create interesting scenarios)
-            # At 14:15 (30 min in), activate G3 due to queue buildup
-            if minute == 30:
-                self.activate_teller("G3")
-            
-            # At 14:45 (60 min in), G2 takes a break
-            if minute == 60:
-                self.deactivate_teller("G2")
+            if snapshot_every and minute % snapshot_every == 0:
+                self.snapshots.append(self.get_current_state())
             
-            # At 15:00 (75 min in), G2 returns, G1 takes break
-            if minute == 75:
-                self.activate_teller("G2")
-                self.deactivate_teller("G1")
+            # Demo-specific events (to create interesting scenarios)
+            if scripted:
+                # At 14:15 (30 min in), activate G3 due to queue buildup
+                if minute == 30 and third is not None:
+                    self.activate_teller(third)
+                
+                # At 14:45 (60 min in), G2 takes a break
+                if minute == 60 and second is not None:
+                    self.deactivate_teller(second)
+                
+                # At 15:00 (75 min in), G2 returns, G1 takes break
+                if minute == 75:
+                    if second is not None:
+                        self.activate_teller(second)
+                    self.deactivate_teller(first)
+                
+                # At 15:15 (90 min in), G1 returns
+                if minute == 90:
+                    self.activate_teller(first)
             
-            # At 15:15 (90 min in), G1 returns
-            if minute == 90:
-                self.activate_teller("G1")
+            if checkpoint_path and minute == checkpoint_minute:
+                from simulation_checkpoint import save_checkpoint
+                save_checkpoint(self, checkpoint_path, next_minute=minute + 1)
         
         print(f"Simulation complete. Total customers: {len(self.customers)}")
-        print(f"Served: {len(self.served_customers)}, Still waiting: {len(self.queue)}")
+        print(f"Served: {len(self.served)}, Still waiting: {len(self.queue)}")
     
-    def export_data(self):
-        """Export simulation data to files"""
+    def export_data(self, output_dir: str = OUTPUT_DIR):
+        """Export simulation data to files in output_dir"""
+        import pandas as pd  # only exports need it; keeps simulation runs light
+        
         # Export customers
         customers_df = pd.DataFrame([
             {
@@ -367,17 +238,18 @@ class CustomerFlowSimulator:
                 "Service End": c["service_end"].strftime("%H:%M:%S") if c["service_end"] else None,
                 "Wait Time (min)": round(c["wait_time"], 2),
                 "Service Duration (min)": c["service_duration"],
-                "Teller": c["teller_name"],
+                "Teller": c["teller_id"],
+                "Teller Name": c["teller_name"],
                 "Status": c["status"]
             }
             for c in self.customers
         ])
-        customers_df.to_csv("/home/ubuntu/blesaf_analysis/simulation_customers.csv", index=False)
+        customers_df.to_csv(os.path.join(output_dir, "simulation_customers.csv"), index=False)
         
         # Export events
         events_df = pd.DataFrame(self.events)
         events_df["time"] = events_df["time"].apply(lambda x: x.strftime("%H:%M:%S"))
-        events_df.to_csv("/home/ubuntu/blesaf_analysis/simulation_events.csv", index=False)
+        events_df.to_csv(os.path.join(output_dir, "simulation_events.csv"), index=False)
         
         # Export snapshots at key demo times
         demo_times = [
@@ -433,13 +305,13 @@ class CustomerFlowSimulator:
             snapshots.append(snapshot)
         
         snapshots_df = pd.DataFrame(snapshots)
-        snapshots_df.to_csv("/home/ubuntu/blesaf_analysis/simulation_snapshots.csv", index=False)
+        snapshots_df.to_csv(os.path.join(output_dir, "simulation_snapshots.csv"), index=False)
         
         # Export detailed state for 14:15 (key demo moment)
         self.current_time = SIMULATION_START_TIME + timedelta(minutes=30)
         state_14_15 = self.get_current_state()
         
-        with open("/home/ubuntu/blesaf_analysis/demo_state_14_15.json", "w") as f:
+        with open(os.path.join(output_dir, "demo_state_14_15.json"), "w") as f:
             json.dump(state_14_15, f, indent=2, default=str)
         
         print("\nData exported successfully:")
@@ -0,0 +1,373 @@
+"""
+BleSaf Fixture Export
+Serializes a simulation run (customers, snapshots, waiting lists, counter
+states, timeline) into the shape of demo-data.js used by the HTML mockups,
+either regenerating the data sections of demo-data.js in place or as a JSON
+fixture covering several branches
+
+Arrays are streamed item by item to the file, so full-day multi-branch
+fixtures never exist in memory as one big document.
+"""
+
+import json
+import os
+import re
+import unicodedata
+from datetime import datetime, timedelta
+
+OUTPUT_DIR = "/home/ubuntu/blesaf_analysis"
+DEMO_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "demo-data.js")
+SLA_MINUTES = 15
+TIMELINE_EVERY = 5  # minutes
+VELOCITY_WARNING = 30  # customers/hour of queue growth worth a recommendation
+
+# Service keys of demo-data.js (DEMO_DATA.services)
+SERVICE_KEYS = {
+    "Dépôt d'espèces": "depot",
+    "Retrait d'espèces": "retrait",
+    "Consultation": "consultation",
+    "Relevés de compte": "releves",
+    "Virement": "virement",
+    "Autres": "autres"
+}
+
+# Presentation fields of DEMO_DATA.meta that no simulation produces
+META_DEFAULTS = {
+    "address": "Les Berges du Lac, Tunis",
+    "tenant": "UIB - Union Internationale de Banques"
+}
+
+MONTHS = ["Janvier", "Février", "Mars", "Avril", "Mai", "Juin", "Juillet",
+          "Août", "Septembre", "Octobre", "Novembre", "Décembre"]
+
+BANNER = re.compile(r"^  // ─── .*$", re.MULTILINE)
+
+
+def service_key(service: str) -> str:
+    if service in SERVICE_KEYS:
+        return SERVICE_KEYS[service]
+    folded = unicodedata.normalize("NFKD", service).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z]", "", folded.split()[0].lower()) if folded.strip() else "autres"
+
+
+def _hhmm(value):
+    return value.strftime("%H:%M") if value else None
+
+
+def health_score(stats: dict) -> int:
+    """0-100 branch health: SLA compliance, capped by the backlog beyond 3 waiting per open counter"""
+    backlog = max(0, stats["queue"] - 3 * stats["activeCounters"])
+    return int(round(max(0, min(stats["sla"], 100 - 4 * backlog))))
+
+
+def health_label(score: int) -> str:
+    # Same thresholds as DEMO_DATA.getHealthLabel
+    if score >= 80:
+        return "Bon"
+    if score >= 60:
+        return "Attention"
+    return "Critique"
+
+
+def counter_status(teller, opened_at, at) -> str:
+    """Counter state in the mockups' words: busy (open, serving or not), break or closed
+
+    The mockups draw every open counter as 'busy' (an idle one just has no
+    ticket); a counter that opened earlier and is no longer active is on a
+    break, one that never opened is closed.
+    """
+    if teller is not None:
+        return "busy"
+    if opened_at is not None and opened_at <= at:
+        return "break"
+    return "closed"
+
+
+def recommendations(stats: dict, counters: list, waiting: list) -> list:
+    """Snapshot recommendations derived from its stats, in the style of the hand-written ones"""
+    recos = []
+    breached = sum(w["slaBreached"] for w in waiting)
+    idle = [c["id"] for c in counters if c["status"] == "break"] + [c["id"] for c in counters if c["status"] == "closed"]
+    backlog = stats["queue"] > 3 * max(stats["activeCounters"], 1)
+    if idle and (stats["sla"] < 60 or backlog):
+        teller_id = idle[0]
+        recos.append({"priority": "critical", "icon": "emergency",
+                      "text": f"CRITIQUE: Ouvrir Guichet {teller_id.lstrip('G')} ! {stats['queue']} clients en attente, "
+                              f"vélocité {stats['velocity']:+}/h.",
+                      "action": f"activate_{teller_id.lower()}"})
+    elif stats["velocity"] >= VELOCITY_WARNING:
+        recos.append({"priority": "warning", "icon": "trending_up",
+                      "text": f"Vélocité en hausse ({stats['velocity']:+}/h). Surveiller la file.", "action": None})
+    if breached:
+        recos.append({"priority": "warning", "icon": "person_alert",
+                      "text": f"{breached} clients dépassent le seuil SLA de {SLA_MINUTES} minutes.", "action": None})
+    for c in counters:
+        if c["status"] == "break":
+            recos.append({"priority": "warning", "icon": "coffee",
+                          "text": f"Pause {c['id']} en cours. SLA à {stats['sla']}%.", "action": None})
+    if not recos:
+        recos.append({"priority": "info", "icon": "check_circle",
+                      "text": f"Situation nominale. {stats['activeCounters']} guichets suffisent pour la charge actuelle.",
+                      "action": None})
+    return recos
+
+
+def customer_records(sim):
+    """DEMO_DATA.customers entries, one per simulated customer"""
+    for c in sim.customers:
+        wait = None
+        if c["service_start"]:
+            wait = round((c["service_start"] - c["arrival_time"]).total_seconds() / 60, 1)
+        yield {
+            "id": c["id"],
+            "name": c["name"],
+            "ticket": c["ticket"],
+            "service": service_key(c["service"]),
+            "arrival": _hhmm(c["arrival_time"]),
+            "serviceStart": _hhmm(c["service_start"]),
+            "serviceEnd": _hhmm(c["service_end"]),
+            "waitMin": wait,
+            "teller": c["teller_id"],
+            "status": c["status"]
+        }
+
+
+def snapshot_records(sim):
+    """DEMO_DATA.snapshots entries: stats, every counter (closed ones too) and the waiting list"""
+    by_ticket = {c["ticket"]: c for c in sim.customers}
+    teller_ids = list(sim.tellers)
+    opened = {}
+    for event in sim.events:
+        if event["type"] == "teller_activated":
+            opened.setdefault(event["teller_id"], event["time"])
+    day = sim.current_time.date()
+
+    for index, s in enumerate(sim.full_snapshots()):
+        at = datetime.combine(day, datetime.strptime(s["time"], "%H:%M").time())
+        stats = {
+            "queue": s["queue_length"],
+            "beingServed": s["being_served"],
+            "totalServed": s["total_served"],
+            "activeCounters": s["active_counters"],
+            "avgWait": s["avg_wait_time"],
+            "sla": s["sla_compliance"],
+            "velocity": s.get("queue_velocity", 0)
+        }
+        active = {t["id"]: t for t in s["active_tellers"]}
+        counters = []
+        for teller_id in teller_ids:
+            teller = active.get(teller_id)
+            customer = by_ticket.get(teller["current_ticket"]) if teller and teller["current_ticket"] else None
+            counters.append({
+                "id": teller_id,
+                "status": counter_status(teller, opened.get(teller_id), at),
+                "ticket": customer["ticket"] if customer else None,
+                "customer": customer["name"] if customer else None,
+                "service": service_key(customer["service"]) if customer else None,
+                "elapsed": round((at - customer["service_start"]).total_seconds() / 60) if customer else 0
+            })
+        score = health_score(stats)
+        waiting = [
+            {"pos": pos, "ticket": w["ticket"], "name": w["name"], "service": service_key(w["service"]),
+             "waitMin": w["wait_time"], "slaBreached": w["wait_time"] > SLA_MINUTES}
+            for pos, w in enumerate(s["waiting_customers"], 1)
+        ]
+        yield {
+            "id": index,
+            "label": s.get("label") or s["time"],
+            "time": s["time"],
+            "stats": stats,
+            "healthScore": score,
+            "healthLabel": health_label(score),
+            "counters": counters,
+            "waiting": waiting,
+            "recommendations": recommendations(stats, counters, waiting),
+            # Editorial content of the hand-written fixture, not simulated
+            "announcement": None
+        }
+
+
+def timeline(sim, every: int = TIMELINE_EVERY):
+    """Queue, in-service and served counts every `every` minutes, from customer timestamps"""
+    import numpy as np
+
+    if not sim.customers:
+        return
+    origin = min(c["arrival_time"] for c in sim.customers).replace(second=0, microsecond=0)
+
+    def minutes(key, condition=lambda c: True):
+        return np.sort([(c[key] - origin).total_seconds() / 60 for c in sim.customers
+                        if c[key] and condition(c)])
+
+    arrivals = minutes("arrival_time")
+    starts = minutes("service_start")
+    ends = minutes("service_end", lambda c: c["status"] == "completed")
+    grid = np.arange(0, (sim.current_time - origin).total_seconds() / 60 + 1, every)
+
+    arrived = np.searchsorted(arrivals, grid, side="right")
+    started = np.searchsorted(starts, grid, side="right")
+    served = np.searchsorted(ends, grid, side="right")
+    for t, a, st, se in zip(grid, arrived, started, served):
+        yield {
+            "time": _hhmm(origin + timedelta(minutes=float(t))),
+            "queue": int(max(0, a - st)),
+            "beingServed": int(st - se),
+            "served": int(se)
+        }
+
+
+def service_breakdown(snapshot: dict) -> dict:
+    """DEMO_DATA.serviceBreakdown of one (decoded) snapshot"""
+    total = snapshot["queue_length"] or 1
+    rows = sorted(snapshot["service_breakdown"].items(), key=lambda item: -item[1]["count"])
+    return {
+        "time": snapshot["time"],
+        "data": [
+            {"service": service_key(service), "count": b["count"], "avgWait": b["avg_wait"],
+             "pct": round(100 * b["count"] / total)}
+            for service, b in rows
+        ]
+    }
+
+
+def _critical_snapshot(sim):
+    """The snapshot with the longest queue (the 14:15 crisis in the demo)"""
+    return max(sim.full_snapshots(), key=lambda s: s["queue_length"], default=None)
+
+
+def meta(sim, scenario: str = "", **overrides) -> dict:
+    day = sim.current_time
+    fields = dict(META_DEFAULTS)
+    fields.update({
+        "date": f"{day.day} {MONTHS[day.month - 1]} {day.year}",
+        "branch": sim.wait_sketches.branch,
+        "scenario": scenario,
+        "slaThreshold": SLA_MINUTES
+    })
+    fields.update(overrides)
+    return fields
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(", ", ": "), default=str)
+
+
+def _write_array(f, items, indent: str):
+    """Stream an iterable as a JSON array, one item per line"""
+    f.write("[")
+    first = True
+    for item in items:
+        f.write(("\n" if first else ",\n") + indent + "  " + _dumps(item))
+        first = False
+    f.write("]" if first else f"\n{indent}]")
+
+
+def _write_value(f, value, indent: str):
+    if isinstance(value, dict) or isinstance(value, (str, int, float)) or value is None:
+        f.write(_dumps(value))
+    else:
+        _write_array(f, value, indent)
+
+
+def sections(sim, scenario: str = "", every: int = TIMELINE_EVERY, **meta_overrides):
+    """(key, value) pairs of the simulated parts of DEMO_DATA; arrays stay lazy"""
+    critical = _critical_snapshot(sim)
+    return [
+        ("meta", meta(sim, scenario, **meta_overrides)),
+        ("customers", customer_records(sim)),
+        ("snapshots", snapshot_records(sim)),
+        ("timeline", timeline(sim, every)),
+        ("serviceBreakdown", service_breakdown(critical) if critical else {"time": None, "data": []})
+    ]
+
+
+def write_json_fixture(runs: dict, path: str, scenario: str = "", every: int = TIMELINE_EVERY) -> str:
+    """Write {"branches": [...]} for several simulations (branch name -> simulator)"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"branches": [')
+        for n, (branch, sim) in enumerate(runs.items()):
+            f.write(",\n  {" if n else "\n  {")
+            for m, (key, value) in enumerate(sections(sim, scenario, every, branch=branch)):
+                f.write(("," if m else "") + f"\n    {_dumps(key)}: ")
+                _write_value(f, value, "    ")
+            f.write("\n  }")
+        f.write("\n]}\n")
+    return path
+
+
+def write_demo_data_js(sim, path: str = DEMO_DATA_PATH, template: str = DEMO_DATA_PATH,
+                       scenario: str = "", every: int = TIMELINE_EVERY) -> str:
+    """Regenerate the simulated sections of demo-data.js, keeping the hand-maintained ones
+
+    Sections are the banner-delimited blocks of the template ("// ─── META ───");
+    meta, customers, snapshots and serviceBreakdown are replaced, a timeline
+    section is added after the snapshots, and services, colors, forecast,
+    kiosk, hq and the helper functions are copied verbatim.
+    """
+    with open(template, encoding="utf-8") as f:
+        source = f.read()
+    starts = [m.start() for m in BANNER.finditer(source)]
+    head, blocks = source[:starts[0]], [source[a:b] for a, b in zip(starts, starts[1:] + [len(source)])]
+    generated = dict(sections(sim, scenario, every))
+    replaced = set(generated)
+    customers = len(sim.customers)
+
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(re.sub(
+            r"^/\*\*.*?\*/",
+            "/**\n * BléSaf Demo Data Module\n * Shared data source for all HTML mockups\n"
+            f" * Scenario: {generated['meta']['branch']}, {generated['meta']['date']}\n"
+            f" * {customers} customers, {len(sim.tellers)} counters (generated by fixture_export.py)\n */",
+            head, count=1, flags=re.DOTALL))
+
+        for block in blocks:
+            key = re.search(r"^  (\w+)[:(]", block, re.MULTILINE)
+            key = key.group(1) if key else None
+            if key not in replaced:
+                f.write(block)
+                continue
+            if key not in generated:
+                continue  # timeline of a previously generated file, already rewritten
+            title = {"customers": f"ALL {customers} CUSTOMERS", "snapshots": "SNAPSHOTS",
+                     "serviceBreakdown": "SERVICE BREAKDOWN AT CRITICAL MOMENT"}.get(key, key.upper())
+            f.write(f"  // ─── {title} {'─' * max(3, 52 - len(title))}\n  {key}: ")
+            _write_value(f, generated.pop(key), "  ")
+            f.write(",\n\n")
+            if key == "snapshots":
+                f.write(f"  // ─── TIMELINE {'─' * 44}\n  timeline: ")
+                _write_value(f, generated.pop("timeline"), "  ")
+                f.write(",\n\n")
+    os.replace(tmp, path)
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+    import random
+    import time
+
+    parser = argparse.ArgumentParser(description="Regenerate demo-data.js (or a JSON fixture) from a simulation run")
+    parser.add_argument("--scenario", help="scenario file (default: demo_scenario.json)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("-o", "--output", default=os.path.join(OUTPUT_DIR, "demo-data.js"),
+                        help="demo-data.js to write (pass demo-data.js to update the mockups in place)")
+    parser.add_argument("--json", help="also write a JSON fixture here")
+    parser.add_argument("--timeline-every", type=int, default=TIMELINE_EVERY)
+    args = parser.parse_args()
+
+    from enhanced_simulation import EnhancedSimulator
+    from scenario import DEMO_SCENARIO_PATH, compile_scenario, load_scenario, run_scenario
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    compiled = compile_scenario(load_scenario(args.scenario or DEMO_SCENARIO_PATH))
+    sim = EnhancedSimulator()
+    run_scenario(sim, compiled, verbose=False)
+
+    start = time.perf_counter()
+    write_demo_data_js(sim, args.output, scenario=compiled.name, every=args.timeline_every)
+    print(f"{args.output} written in {time.perf_counter() - start:.2f}s")
+    if args.json:
+        write_json_fixture({sim.wait_sketches.branch: sim}, args.json, compiled.name, args.timeline_every)
+        print(f"{args.json} written")
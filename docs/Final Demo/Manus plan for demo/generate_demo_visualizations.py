@@ -2,11 +2,10 @@
 Generate visualizations for BleSaf demo
 """
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
+import os
 from datetime import datetime, timedelta
-import numpy as np
+
+OUTPUT_DIR = "/home/ubuntu/blesaf_analysis"
 
 # Teller data
 TELLERS = {
@@ -16,20 +15,6 @@ TELLERS = {
     "G4": {"name": "Yasmine Mansour"}
 }
 
-# Read the simulation data
-snapshots = pd.read_csv("/home/ubuntu/blesaf_analysis/demo_snapshots.csv")
-customers = pd.read_csv("/home/ubuntu/blesaf_analysis/demo_customers.csv")
-
-# Set style
-plt.style.use('seaborn-v0_8-darkgrid')
-plt.rcParams['font.size'] = 11
-plt.rcParams['axes.labelsize'] = 12
-plt.rcParams['axes.titlesize'] = 14
-plt.rcParams['xtick.labelsize'] = 10
-plt.rcParams['ytick.labelsize'] = 10
-plt.rcParams['legend.fontsize'] = 10
-plt.rcParams['figure.titlesize'] = 16
-
 # Color scheme
 COLOR_PRIMARY = '#1E3A8A'  # Dark blue
 COLOR_SUCCESS = '#10B981'  # Green
@@ -37,242 +22,441 @@ COLOR_WARNING = '#F59E0B'  # Orange
 COLOR_DANGER = '#EF4444'   # Red
 COLOR_NEUTRAL = '#6B7280'  # Gray
 
-# 1. Queue Length Over Time
-fig, ax = plt.subplots(figsize=(12, 6))
-times = [datetime.strptime("2024-10-26 14:00", "%Y-%m-%d %H:%M") + timedelta(minutes=i) for i in [0, 10, 15, 30, 45, 60]]
-queue_lengths = snapshots['Queue'].values
-
-ax.plot(times, queue_lengths, marker='o', linewidth=3, markersize=10, color=COLOR_PRIMARY, label='Queue Length')
-ax.axvline(times[2], color=COLOR_DANGER, linestyle='--', linewidth=2, alpha=0.7, label='Critical Moment (14:15)')
-ax.axvline(times[3], color=COLOR_SUCCESS, linestyle='--', linewidth=2, alpha=0.7, label='After G3 Activation (14:30)')
-
-# Annotations
-ax.annotate('Peak: 19 customers', xy=(times[2], queue_lengths[2]), 
-            xytext=(times[2], queue_lengths[2] + 3),
-            ha='center', fontsize=11, fontweight='bold',
-            bbox=dict(boxstyle='round,pad=0.5', facecolor=COLOR_DANGER, alpha=0.7, edgecolor='none'),
-            color='white')
-
-ax.annotate('G3 Activated', xy=(times[2], 0), xytext=(times[2], -3),
-            ha='center', fontsize=10,
-            arrowprops=dict(arrowstyle='->', color=COLOR_SUCCESS, lw=2))
-
-ax.set_xlabel('Time', fontweight='bold')
-ax.set_ylabel('Number of Customers Waiting', fontweight='bold')
-ax.set_title('Queue Length Throughout Demo Period', fontweight='bold', pad=20)
-ax.legend(loc='upper left')
-ax.grid(True, alpha=0.3)
-ax.set_ylim(-5, 25)
-
-plt.tight_layout()
-plt.savefig('/home/ubuntu/blesaf_analysis/viz_queue_length.png', dpi=300, bbox_inches='tight')
-plt.close()
-
-# 2. SLA Compliance Trajectory
-fig, ax = plt.subplots(figsize=(12, 6))
-sla_values = snapshots['SLA %'].values
-
-ax.plot(times, sla_values, marker='o', linewidth=3, markersize=10, color=COLOR_PRIMARY, label='SLA Compliance')
-ax.axhline(90, color=COLOR_WARNING, linestyle='--', linewidth=2, alpha=0.5, label='Warning Threshold (90%)')
-ax.axhline(75, color=COLOR_DANGER, linestyle='--', linewidth=2, alpha=0.5, label='Critical Threshold (75%)')
-
-# Fill areas
-ax.fill_between(times, 90, 100, alpha=0.2, color=COLOR_SUCCESS, label='Healthy Zone')
-ax.fill_between(times, 75, 90, alpha=0.2, color=COLOR_WARNING, label='Warning Zone')
-ax.fill_between(times, 0, 75, alpha=0.2, color=COLOR_DANGER, label='Critical Zone')
-
-# Annotations
-ax.annotate('Crisis Point\n50% SLA', xy=(times[5], sla_values[5]), 
-            xytext=(times[4], 40),
-            ha='center', fontsize=11, fontweight='bold',
-            bbox=dict(boxstyle='round,pad=0.5', facecolor=COLOR_DANGER, alpha=0.7, edgecolor='none'),
-            color='white',
-            arrowprops=dict(arrowstyle='->', color=COLOR_DANGER, lw=2))
-
-ax.set_xlabel('Time', fontweight='bold')
-ax.set_ylabel('SLA Compliance (%)', fontweight='bold')
-ax.set_title('SLA Compliance Trajectory - Impact of Queue Buildup', fontweight='bold', pad=20)
-ax.legend(loc='lower left', ncol=2)
-ax.grid(True, alpha=0.3)
-ax.set_ylim(0, 110)
-
-plt.tight_layout()
-plt.savefig('/home/ubuntu/blesaf_analysis/viz_sla_trajectory.png', dpi=300, bbox_inches='tight')
-plt.close()
-
-# 3. Service Breakdown at 14:15 (Critical Moment)
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-
-# Pie chart
-services = ['Dépôt d\'espèces', 'Consultation', 'Retrait d\'espèces', 'Relevés de compte', 'Virement', 'Autres']
-counts = [10, 3, 2, 2, 1, 1]
-colors = [COLOR_DANGER, COLOR_WARNING, COLOR_PRIMARY, COLOR_PRIMARY, COLOR_NEUTRAL, COLOR_NEUTRAL]
-explode = (0.1, 0, 0, 0, 0, 0)  # Explode the bottleneck
-
-ax1.pie(counts, labels=services, autopct='%1.0f%%', startangle=90, colors=colors, explode=explode,
-        textprops={'fontsize': 11, 'fontweight': 'bold'})
-ax1.set_title('Service Distribution at 14:15\n(Critical Moment)', fontweight='bold', pad=20)
-
-# Bar chart of wait times
-wait_times = [4.5, 1.6, 6.5, 1.3, 3.9, 7.5]
-bars = ax2.barh(services, wait_times, color=colors)
-
-# Add SLA threshold line
-ax2.axvline(15, color=COLOR_DANGER, linestyle='--', linewidth=2, alpha=0.7, label='SLA Threshold (15 min)')
-
-# Annotate the bottleneck
-ax2.annotate('BOTTLENECK', xy=(wait_times[0], 0), xytext=(wait_times[0] + 2, 0),
-             fontsize=11, fontweight='bold', color=COLOR_DANGER,
-             arrowprops=dict(arrowstyle='->', color=COLOR_DANGER, lw=2))
-
-ax2.set_xlabel('Average Wait Time (minutes)', fontweight='bold')
-ax2.set_title('Average Wait Time by Service\nat 14:15', fontweight='bold', pad=20)
-ax2.legend()
-ax2.grid(True, alpha=0.3, axis='x')
-
-plt.tight_layout()
-plt.savefig('/home/ubuntu/blesaf_analysis/viz_service_breakdown.png', dpi=300, bbox_inches='tight')
-plt.close()
-
-# 4. Counter Utilization Timeline
-fig, ax = plt.subplots(figsize=(14, 6))
-
-# Timeline data
-timeline_data = {
+# Day the HH:MM snapshot times are plotted on
+CHART_DATE = "2024-10-26"
+
+# Service mix and average waits (minutes) at the demo's 14:15 critical moment
+DEMO_BREAKDOWN = {
+    "Dépôt d'espèces": {"count": 10, "avg_wait": 4.5},
+    "Consultation": {"count": 3, "avg_wait": 1.6},
+    "Retrait d'espèces": {"count": 2, "avg_wait": 6.5},
+    "Relevés de compte": {"count": 2, "avg_wait": 1.3},
+    "Virement": {"count": 1, "avg_wait": 3.9},
+    "Autres": {"count": 1, "avg_wait": 7.5}
+}
+
+# Counter activity of the scripted demo (minutes from 14:00)
+DEMO_TIMELINE = {
     'G1': [(0, 60, 'Active')],
     'G2': [(0, 45, 'Active'), (45, 60, 'Break')],
     'G3': [(16, 60, 'Active')],
     'G4': []
 }
 
-colors_status = {'Active': COLOR_SUCCESS, 'Break': COLOR_WARNING, 'Idle': COLOR_NEUTRAL}
-
-y_pos = 0
-for teller, periods in timeline_data.items():
-    for start, end, status in periods:
-        ax.barh(y_pos, end - start, left=start, height=0.8, 
-                color=colors_status[status], edgecolor='white', linewidth=2)
-    
-    # Add idle periods
-    if not periods:
-        ax.barh(y_pos, 60, left=0, height=0.8, color=colors_status['Idle'], 
-                edgecolor='white', linewidth=2, alpha=0.3)
-    
-    y_pos += 1
-
-# Add critical moment marker
-ax.axvline(15, color=COLOR_DANGER, linestyle='--', linewidth=3, alpha=0.7, label='Critical Moment (14:15)')
-ax.axvline(16, color=COLOR_PRIMARY, linestyle='--', linewidth=3, alpha=0.7, label='G3 Activated (14:16)')
-
-ax.set_yticks(range(len(timeline_data)))
-ax.set_yticklabels([f'{k} - {TELLERS[k]["name"]}' for k in timeline_data.keys()])
-ax.set_xlabel('Time (minutes from 14:00)', fontweight='bold')
-ax.set_title('Counter Utilization Timeline - Demo Period', fontweight='bold', pad=20)
-ax.set_xlim(0, 60)
-ax.grid(True, alpha=0.3, axis='x')
-
-# Legend
-legend_elements = [mpatches.Patch(facecolor=colors_status['Active'], label='Active'),
-                   mpatches.Patch(facecolor=colors_status['Break'], label='Break'),
-                   mpatches.Patch(facecolor=colors_status['Idle'], label='Idle', alpha=0.3)]
-ax.legend(handles=legend_elements, loc='upper right')
-
-plt.tight_layout()
-plt.savefig('/home/ubuntu/blesaf_analysis/viz_counter_utilization.png', dpi=300, bbox_inches='tight')
-plt.close()
-
-# 5. Queue Velocity Indicator
-fig, ax = plt.subplots(figsize=(12, 6))
-
-queue_velocity = snapshots['Queue Velocity'].values
-
-# Create color map based on velocity
-colors_velocity = [COLOR_DANGER if v > 50 else COLOR_WARNING if v > 20 else COLOR_SUCCESS for v in queue_velocity]
-
-bars = ax.bar(range(len(times)), queue_velocity, color=colors_velocity, edgecolor='white', linewidth=2, width=0.6)
-
-# Add threshold lines
-ax.axhline(0, color='black', linewidth=1)
-ax.axhline(50, color=COLOR_DANGER, linestyle='--', linewidth=2, alpha=0.5, label='Critical (+50/hr)')
-ax.axhline(20, color=COLOR_WARNING, linestyle='--', linewidth=2, alpha=0.5, label='Warning (+20/hr)')
-
-# Annotations
-ax.annotate('CRISIS\n+84/hr', xy=(2, queue_velocity[2]), 
-            xytext=(2, queue_velocity[2] + 15),
-            ha='center', fontsize=12, fontweight='bold',
-            bbox=dict(boxstyle='round,pad=0.5', facecolor=COLOR_DANGER, alpha=0.8, edgecolor='none'),
-            color='white',
-            arrowprops=dict(arrowstyle='->', color=COLOR_DANGER, lw=2))
-
-ax.set_xticks(range(len(times)))
-ax.set_xticklabels([t.strftime("%H:%M") for t in times])
-ax.set_xlabel('Time', fontweight='bold')
-ax.set_ylabel('Queue Velocity (customers/hour)', fontweight='bold')
-ax.set_title('Queue Velocity - Rate of Queue Growth/Shrinkage', fontweight='bold', pad=20)
-ax.legend(loc='upper left')
-ax.grid(True, alpha=0.3, axis='y')
-
-plt.tight_layout()
-plt.savefig('/home/ubuntu/blesaf_analysis/viz_queue_velocity.png', dpi=300, bbox_inches='tight')
-plt.close()
-
-# 6. Predictive Demand Forecast (for the finale)
-fig, ax = plt.subplots(figsize=(14, 6))
-
-# Generate forecast data
-forecast_times = [datetime.strptime("2024-10-26 14:00", "%Y-%m-%d %H:%M") + timedelta(minutes=i) for i in range(0, 121, 15)]
-# Simulated demand curve (peak at 14:15, declining after)
-demand_values = [8, 12, 18, 15, 10, 8, 6, 5, 4]
-
-# Confidence interval
-upper_bound = [v * 1.15 for v in demand_values]
-lower_bound = [v * 0.85 for v in demand_values]
-
-# Plot
-ax.plot(forecast_times, demand_values, linewidth=3, color=COLOR_PRIMARY, label='Predicted Arrivals', marker='o', markersize=8)
-ax.fill_between(forecast_times, lower_bound, upper_bound, alpha=0.2, color=COLOR_PRIMARY, label='95% Confidence Interval')
-
-# Annotations
-ax.annotate('Current Peak\nKeep 3 counters active', xy=(forecast_times[2], demand_values[2]), 
-            xytext=(forecast_times[2], demand_values[2] + 4),
-            ha='center', fontsize=10, fontweight='bold',
-            bbox=dict(boxstyle='round,pad=0.5', facecolor=COLOR_WARNING, alpha=0.7, edgecolor='none'),
-            arrowprops=dict(arrowstyle='->', color=COLOR_WARNING, lw=2))
-
-ax.annotate('Optimal Break Window\nDemand dropping', xy=(forecast_times[4], demand_values[4]), 
-            xytext=(forecast_times[5], demand_values[4] + 5),
-            ha='center', fontsize=10, fontweight='bold',
-            bbox=dict(boxstyle='round,pad=0.5', facecolor=COLOR_SUCCESS, alpha=0.7, edgecolor='none'),
-            arrowprops=dict(arrowstyle='->', color=COLOR_SUCCESS, lw=2))
-
-ax.annotate('Low Demand\nReturn to 2 counters', xy=(forecast_times[7], demand_values[7]), 
-            xytext=(forecast_times[7], demand_values[7] + 4),
-            ha='center', fontsize=10, fontweight='bold',
-            bbox=dict(boxstyle='round,pad=0.5', facecolor=COLOR_PRIMARY, alpha=0.7, edgecolor='none'),
-            arrowprops=dict(arrowstyle='->', color=COLOR_PRIMARY, lw=2))
-
-# Add "87% accuracy" badge
-ax.text(0.98, 0.98, '87% Prediction\nAccuracy', transform=ax.transAxes,
-        fontsize=12, fontweight='bold', va='top', ha='right',
-        bbox=dict(boxstyle='round,pad=0.8', facecolor='white', edgecolor=COLOR_PRIMARY, linewidth=3))
-
-ax.set_xlabel('Time', fontweight='bold')
-ax.set_ylabel('Predicted Customer Arrivals (per 15 min)', fontweight='bold')
-ax.set_title('Predictive Demand Forecasting - AI-Powered Staffing Optimization', fontweight='bold', pad=20)
-ax.legend(loc='upper left')
-ax.grid(True, alpha=0.3)
-
-plt.tight_layout()
-plt.savefig('/home/ubuntu/blesaf_analysis/viz_predictive_demand.png', dpi=300, bbox_inches='tight')
-plt.close()
-
-print("All visualizations generated successfully!")
-print("\nGenerated files:")
-print("- viz_queue_length.png")
-print("- viz_sla_trajectory.png")
-print("- viz_service_breakdown.png")
-print("- viz_counter_utilization.png")
-print("- viz_queue_velocity.png")
-print("- viz_predictive_demand.png")
+CHARTS = [
+    "viz_queue_length.png",
+    "viz_sla_trajectory.png",
+    "viz_service_breakdown.png",
+    "viz_counter_utilization.png",
+    "viz_queue_velocity.png",
+    "viz_predictive_demand.png"
+]
+
+
+def _pyplot():
+    """Import matplotlib on first use and apply the report style"""
+    import matplotlib.pyplot as plt
+
+    plt.style.use('seaborn-v0_8-darkgrid')
+    plt.rcParams['font.size'] = 11
+    plt.rcParams['axes.labelsize'] = 12
+    plt.rcParams['axes.titlesize'] = 14
+    plt.rcParams['xtick.labelsize'] = 10
+    plt.rcParams['ytick.labelsize'] = 10
+    plt.rcParams['legend.fontsize'] = 10
+    plt.rcParams['figure.titlesize'] = 16
+    return plt
+
+
+def _snapshot_times(snapshots):
+    """Datetimes of the snapshots' HH:MM Time column (a day is added when the clock wraps)"""
+    times, day = [], datetime.strptime(CHART_DATE, "%Y-%m-%d")
+    for text in snapshots['Time']:
+        time = datetime.strptime(f"{day:%Y-%m-%d} {text}", "%Y-%m-%d %H:%M")
+        if times and time < times[-1]:
+            day += timedelta(days=1)
+            time += timedelta(days=1)
+        times.append(time)
+    return times
+
+
+def _clock_axis(ax):
+    """HH:MM tick labels on a datetime x axis"""
+    import matplotlib.dates as mdates
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
+
+
+def _counter_openings(snapshots, times):
+    """(time, counters) of every snapshot where more counters are open than at the previous one"""
+    counters = snapshots['Active Counters'].values
+    return [(times[i], int(counters[i])) for i in range(1, len(counters)) if counters[i] > counters[i - 1]]
+
+
+def plot_queue_length(snapshots, output_dir=OUTPUT_DIR):
+    """Queue length at each demo snapshot"""
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(12, 6))
+    times = _snapshot_times(snapshots)
+    queue_lengths = snapshots['Queue'].values
+    peak = int(queue_lengths.argmax())
+
+    ax.plot(times, queue_lengths, marker='o', linewidth=3, markersize=10, color=COLOR_PRIMARY, label='Queue Length')
+    ax.axvline(times[peak], color=COLOR_DANGER, linestyle='--', linewidth=2, alpha=0.7,
+               label=f'Peak ({times[peak]:%H:%M})')
+    for i, (time, counters) in enumerate(_counter_openings(snapshots, times)):
+        ax.axvline(time, color=COLOR_SUCCESS, linestyle='--', linewidth=2, alpha=0.7,
+                   label='Counter Opened' if i == 0 else None)
+        ax.annotate(f'{counters} counters', xy=(time, 0), xytext=(time, -3),
+                    ha='center', fontsize=10,
+                    arrowprops=dict(arrowstyle='->', color=COLOR_SUCCESS, lw=2))
+
+    # Annotations
+    ax.annotate(f'Peak: {queue_lengths[peak]} customers', xy=(times[peak], queue_lengths[peak]), 
+                xytext=(times[peak], queue_lengths[peak] + 3),
+                ha='center', fontsize=11, fontweight='bold',
+                bbox=dict(boxstyle='round,pad=0.5', facecolor=COLOR_DANGER, alpha=0.7, edgecolor='none'),
+                color='white')
+
+    ax.set_xlabel('Time', fontweight='bold')
+    ax.set_ylabel('Number of Customers Waiting', fontweight='bold')
+    ax.set_title('Queue Length Throughout Demo Period', fontweight='bold', pad=20)
+    ax.legend(loc='upper left')
+    ax.grid(True, alpha=0.3)
+    ax.set_ylim(-5, max(25, queue_lengths[peak] + 6))
+    _clock_axis(ax)
+
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, 'viz_queue_length.png'), dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def plot_sla_trajectory(snapshots, output_dir=OUTPUT_DIR):
+    """SLA compliance trajectory with health zones"""
+    plt = _pyplot()
+    times = _snapshot_times(snapshots)
+    fig, ax = plt.subplots(figsize=(12, 6))
+    sla_values = snapshots['SLA %'].values
+    low = int(sla_values.argmin())
+
+    ax.plot(times, sla_values, marker='o', linewidth=3, markersize=10, color=COLOR_PRIMARY, label='SLA Compliance')
+    ax.axhline(90, color=COLOR_WARNING, linestyle='--', linewidth=2, alpha=0.5, label='Warning Threshold (90%)')
+    ax.axhline(75, color=COLOR_DANGER, linestyle='--', linewidth=2, alpha=0.5, label='Critical Threshold (75%)')
+
+    # Fill areas
+    ax.fill_between(times, 90, 100, alpha=0.2, color=COLOR_SUCCESS, label='Healthy Zone')
+    ax.fill_between(times, 75, 90, alpha=0.2, color=COLOR_WARNING, label='Warning Zone')
+    ax.fill_between(times, 0, 75, alpha=0.2, color=COLOR_DANGER, label='Critical Zone')
+
+    # Annotations
+    zone = COLOR_DANGER if sla_values[low] < 75 else COLOR_WARNING if sla_values[low] < 90 else COLOR_SUCCESS
+    ax.annotate(f'{"Crisis Point" if sla_values[low] < 75 else "Lowest Point"}\n{sla_values[low]:.0f}% SLA',
+                xy=(times[low], sla_values[low]),
+                xytext=(times[max(low - 1, 0)], max(sla_values[low] - 10, 10)),
+                ha='center', fontsize=11, fontweight='bold',
+                bbox=dict(boxstyle='round,pad=0.5', facecolor=zone, alpha=0.7, edgecolor='none'),
+                color='white',
+                arrowprops=dict(arrowstyle='->', color=zone, lw=2))
+
+    ax.set_xlabel('Time', fontweight='bold')
+    ax.set_ylabel('SLA Compliance (%)', fontweight='bold')
+    ax.set_title('SLA Compliance Trajectory - Impact of Queue Buildup', fontweight='bold', pad=20)
+    ax.legend(loc='lower left', ncol=2)
+    ax.grid(True, alpha=0.3)
+    ax.set_ylim(0, 110)
+    _clock_axis(ax)
+
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, 'viz_sla_trajectory.png'), dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def plot_service_breakdown(output_dir=OUTPUT_DIR, breakdown=None, at="14:15"):
+    """Service mix and waits at the critical moment
+
+    breakdown is a snapshot's service_breakdown ({service: {count, avg_wait}});
+    the demo's 14:15 figures are drawn without one.
+    """
+    plt = _pyplot()
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+
+    # Pie chart, busiest service first
+    ranked = sorted((breakdown or DEMO_BREAKDOWN).items(), key=lambda item: -item[1]['count'])
+    services = [service for service, _ in ranked]
+    counts = [entry['count'] for _, entry in ranked]
+    colors = ([COLOR_DANGER, COLOR_WARNING, COLOR_PRIMARY, COLOR_PRIMARY] + [COLOR_NEUTRAL] * len(ranked))[:len(ranked)]
+    explode = [0.1] + [0] * (len(ranked) - 1)  # Explode the bottleneck
+
+    ax1.pie(counts, labels=services, autopct='%1.0f%%', startangle=90, colors=colors, explode=explode,
+            textprops={'fontsize': 11, 'fontweight': 'bold'})
+    ax1.set_title(f'Service Distribution at {at}\n(Critical Moment)', fontweight='bold', pad=20)
+
+    # Bar chart of wait times
+    wait_times = [entry['avg_wait'] for _, entry in ranked]
+    bars = ax2.barh(services, wait_times, color=colors)
+
+    # Add SLA threshold line
+    ax2.axvline(15, color=COLOR_DANGER, linestyle='--', linewidth=2, alpha=0.7, label='SLA Threshold (15 min)')
+
+    # Annotate the bottleneck
+    ax2.annotate('BOTTLENECK', xy=(wait_times[0], 0), xytext=(wait_times[0] + 2, 0),
+                 fontsize=11, fontweight='bold', color=COLOR_DANGER,
+                 arrowprops=dict(arrowstyle='->', color=COLOR_DANGER, lw=2))
+
+    ax2.set_xlabel('Average Wait Time (minutes)', fontweight='bold')
+    ax2.set_title(f'Average Wait Time by Service\nat {at}', fontweight='bold', pad=20)
+    ax2.legend()
+    ax2.grid(True, alpha=0.3, axis='x')
+
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, 'viz_service_breakdown.png'), dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def plot_counter_utilization(output_dir=OUTPUT_DIR, timeline_data=None):
+    """Counter activity timeline; timeline_data maps teller -> [(start, end, status)]
+
+    Without timeline_data the scripted demo timeline is drawn, with its
+    14:15 markers; teller_analytics.timeline_data() builds one from a
+    simulation's event log.
+    """
+    plt = _pyplot()
+    import matplotlib.patches as mpatches
+
+    fig, ax = plt.subplots(figsize=(14, 6))
+
+    demo = timeline_data is None
+    if demo:
+        timeline_data = DEMO_TIMELINE
+    span = max([60] + [end for periods in timeline_data.values() for _, end, _ in periods])
+
+    colors_status = {'Active': COLOR_SUCCESS, 'Break': COLOR_WARNING, 'Idle': COLOR_NEUTRAL}
+
+    y_pos = 0
+    for teller, periods in timeline_data.items():
+        for start, end, status in periods:
+            ax.barh(y_pos, end - start, left=start, height=0.8, 
+                    color=colors_status[status], edgecolor='white', linewidth=2)
+
+        # Add idle periods
+        if not periods:
+            ax.barh(y_pos, span, left=0, height=0.8, color=colors_status['Idle'], 
+                    edgecolor='white', linewidth=2, alpha=0.3)
+
+        y_pos += 1
+
+    if demo:
+        # Add critical moment marker
+        ax.axvline(15, color=COLOR_DANGER, linestyle='--', linewidth=3, alpha=0.7, label='Critical Moment (14:15)')
+        ax.axvline(16, color=COLOR_PRIMARY, linestyle='--', linewidth=3, alpha=0.7, label='G3 Activated (14:16)')
+
+    ax.set_yticks(range(len(timeline_data)))
+    ax.set_yticklabels([f'{k} - {TELLERS[k]["name"]}' if k in TELLERS else k for k in timeline_data.keys()])
+    ax.set_xlabel('Time (minutes from 14:00)' if demo else 'Time (minutes from first opening)', fontweight='bold')
+    ax.set_title('Counter Utilization Timeline - Demo Period', fontweight='bold', pad=20)
+    ax.set_xlim(0, span)
+    ax.grid(True, alpha=0.3, axis='x')
+
+    # Legend
+    legend_elements = [mpatches.Patch(facecolor=colors_status['Active'], label='Active'),
+                       mpatches.Patch(facecolor=colors_status['Break'], label='Break'),
+                       mpatches.Patch(facecolor=colors_status['Idle'], label='Idle', alpha=0.3)]
+    ax.legend(handles=legend_elements, loc='upper right')
+
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, 'viz_counter_utilization.png'), dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def plot_queue_velocity(snapshots, output_dir=OUTPUT_DIR):
+    """Queue velocity at each demo snapshot"""
+    plt = _pyplot()
+    times = _snapshot_times(snapshots)
+    fig, ax = plt.subplots(figsize=(12, 6))
+
+    queue_velocity = snapshots['Queue Velocity'].values
+    fastest = int(queue_velocity.argmax())
+
+    # Create color map based on velocity
+    colors_velocity = [COLOR_DANGER if v > 50 else COLOR_WARNING if v > 20 else COLOR_SUCCESS for v in queue_velocity]
+
+    bars = ax.bar(range(len(times)), queue_velocity, color=colors_velocity, edgecolor='white', linewidth=2, width=0.6)
+
+    # Add threshold lines
+    ax.axhline(0, color='black', linewidth=1)
+    ax.axhline(50, color=COLOR_DANGER, linestyle='--', linewidth=2, alpha=0.5, label='Critical (+50/hr)')
+    ax.axhline(20, color=COLOR_WARNING, linestyle='--', linewidth=2, alpha=0.5, label='Warning (+20/hr)')
+
+    # Annotations
+    peak_color = colors_velocity[fastest]
+    ax.annotate(f'{"CRISIS" if queue_velocity[fastest] > 50 else "PEAK"}\n{queue_velocity[fastest]:+.0f}/hr',
+                xy=(fastest, queue_velocity[fastest]), 
+                xytext=(fastest, queue_velocity[fastest] + 15),
+                ha='center', fontsize=12, fontweight='bold',
+                bbox=dict(boxstyle='round,pad=0.5', facecolor=peak_color, alpha=0.8, edgecolor='none'),
+                color='white',
+                arrowprops=dict(arrowstyle='->', color=peak_color, lw=2))
+
+    ax.set_ylim(min(0, queue_velocity.min()) - 10, queue_velocity[fastest] + 35)  # room for the label
+    ax.set_xticks(range(len(times)))
+    ax.set_xticklabels([t.strftime("%H:%M") for t in times])
+    ax.set_xlabel('Time', fontweight='bold')
+    ax.set_ylabel('Queue Velocity (customers/hour)', fontweight='bold')
+    ax.set_title('Queue Velocity - Rate of Queue Growth/Shrinkage', fontweight='bold', pad=20)
+    ax.legend(loc='upper left')
+    ax.grid(True, alpha=0.3, axis='y')
+
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, 'viz_queue_velocity.png'), dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def plot_predictive_demand(output_dir=OUTPUT_DIR):
+    """Predictive demand forecast (for the finale)"""
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(14, 6))
+
+    # Generate forecast data
+    forecast_times = [datetime.strptime("2024-10-26 14:00", "%Y-%m-%d %H:%M") + timedelta(minutes=i) for i in range(0, 121, 15)]
+    # Simulated demand curve (peak at 14:15, declining after)
+    demand_values = [8, 12, 18, 15, 10, 8, 6, 5, 4]
+
+    # Confidence interval
+    upper_bound = [v * 1.15 for v in demand_values]
+    lower_bound = [v * 0.85 for v in demand_values]
+
+    # Plot
+    ax.plot(forecast_times, demand_values, linewidth=3, color=COLOR_PRIMARY, label='Predicted Arrivals', marker='o', markersize=8)
+    ax.fill_between(forecast_times, lower_bound, upper_bound, alpha=0.2, color=COLOR_PRIMARY, label='95% Confidence Interval')
+
+    # Annotations
+    ax.annotate('Current Peak\nKeep 3 counters active', xy=(forecast_times[2], demand_values[2]), 
+                xytext=(forecast_times[2], demand_values[2] + 4),
+                ha='center', fontsize=10, fontweight='bold',
+                bbox=dict(boxstyle='round,pad=0.5', facecolor=COLOR_WARNING, alpha=0.7, edgecolor='none'),
+                arrowprops=dict(arrowstyle='->', color=COLOR_WARNING, lw=2))
+
+    ax.annotate('Optimal Break Window\nDemand dropping', xy=(forecast_times[4], demand_values[4]), 
+                xytext=(forecast_times[5], demand_values[4] + 5),
+                ha='center', fontsize=10, fontweight='bold',
+                bbox=dict(boxstyle='round,pad=0.5', facecolor=COLOR_SUCCESS, alpha=0.7, edgecolor='none'),
+                arrowprops=dict(arrowstyle='->', color=COLOR_SUCCESS, lw=2))
+
+    ax.annotate('Low Demand\nReturn to 2 counters', xy=(forecast_times[7], demand_values[7]), 
+                xytext=(forecast_times[7], demand_values[7] + 4),
+                ha='center', fontsize=10, fontweight='bold',
+                bbox=dict(boxstyle='round,pad=0.5', facecolor=COLOR_PRIMARY, alpha=0.7, edgecolor='none'),
+                arrowprops=dict(arrowstyle='->', color=COLOR_PRIMARY, lw=2))
+
+    # Add "87% accuracy" badge
+    ax.text(0.98, 0.98, '87% Prediction\nAccuracy', transform=ax.transAxes,
+            fontsize=12, fontweight='bold', va='top', ha='right',
+            bbox=dict(boxstyle='round,pad=0.8', facecolor='white', edgecolor=COLOR_PRIMARY, linewidth=3))
+
+    ax.set_xlabel('Time', fontweight='bold')
+    ax.set_ylabel('Predicted Customer Arrivals (per 15 min)', fontweight='bold')
+    ax.set_title('Predictive Demand Forecasting - AI-Powered Staffing Optimization', fontweight='bold', pad=20)
+    ax.legend(loc='upper left')
+    ax.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, 'viz_predictive_demand.png'), dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+# Per-minute series charts rendered when the simulator recorded one (see timeseries.py)
+SERIES_CHARTS = {
+    "queue_length": ("viz_queue_length_series.png", "Number of Customers Waiting"),
+    "sla_compliance": ("viz_sla_series.png", "SLA Compliance (%)"),
+    "wait_p90": ("viz_wait_p90_series.png", "P90 Wait (minutes)")
+}
 
 
+def plot_metric_series(data_dir, metric, output_dir=OUTPUT_DIR, max_points=None):
+    """A long-horizon metric: bucket means with their min/max envelope
+
+    Reads the finest pre-aggregated resolution that fits in max_points, so
+    a week of per-minute data draws hourly buckets instead of 10,080 points.
+    """
+    from timeseries import MAX_POINTS, load_for_chart
+
+    plt = _pyplot()
+    filename, ylabel = SERIES_CHARTS[metric]
+    series = load_for_chart(data_dir, metric, max_points or MAX_POINTS)
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.fill_between(series.index, series['min'], series['max'], alpha=0.2, color=COLOR_PRIMARY, label='Min / Max')
+    ax.plot(series.index, series['mean'], linewidth=2, color=COLOR_PRIMARY, label='Mean')
+    if metric == 'sla_compliance':
+        ax.axhline(90, color=COLOR_WARNING, linestyle='--', linewidth=2, alpha=0.5, label='Warning Threshold (90%)')
+        ax.axhline(75, color=COLOR_DANGER, linestyle='--', linewidth=2, alpha=0.5, label='Critical Threshold (75%)')
+
+    ax.set_xlabel('Time', fontweight='bold')
+    ax.set_ylabel(ylabel, fontweight='bold')
+    ax.set_title(f'{ylabel} - {len(series)} points', fontweight='bold', pad=20)
+    ax.legend(loc='upper left')
+    ax.grid(True, alpha=0.3)
+    fig.autofmt_xdate()
+
+    plt.tight_layout()
+    plt.savefig(os.path.join(output_dir, filename), dpi=300, bbox_inches='tight')
+    plt.close()
+    return os.path.join(output_dir, filename)
+
+
+def _event_timeline(data_dir):
+    """Counter timeline from the demo_events.csv of an export, None if there is none"""
+    path = os.path.join(data_dir, "demo_events.csv")
+    if not os.path.exists(path):
+        return None
+    from teller_analytics import events_frame, teller_intervals, timeline_data
+
+    events = events_frame(path)
+    origin = events.loc[events["type"] == "teller_activated", "time"].min()
+    timeline = timeline_data(teller_intervals(events), origin)
+    # Every configured counter gets a row, opened or not
+    return {teller: timeline.get(teller, []) for teller in list(TELLERS) + sorted(set(timeline) - set(TELLERS))}
+
+
+def _critical_breakdown(data_dir):
+    """(service_breakdown, HH:MM) of an export's detailed 14:15 state, (None, "14:15") without one"""
+    import json
+
+    path = os.path.join(data_dir, "demo_state_14_15_detailed.json")
+    if not os.path.exists(path):
+        return None, "14:15"
+    with open(path, encoding="utf-8") as f:
+        state = json.load(f)
+    return state.get("service_breakdown") or None, state.get("time", "14:15")
+
+
+def render_all(data_dir=OUTPUT_DIR, output_dir=OUTPUT_DIR):
+    """Render every chart from the demo_snapshots.csv written by the simulators
+
+    Snapshot charts follow the export's Time column and annotate its own
+    peaks; the service breakdown uses demo_state_14_15_detailed.json, the
+    counter timeline demo_events.csv and per-minute series charts a
+    demo_series export, when present.
+    """
+    import pandas as pd
+
+    snapshots = pd.read_csv(os.path.join(data_dir, "demo_snapshots.csv"))
+    plot_queue_length(snapshots, output_dir)
+    plot_sla_trajectory(snapshots, output_dir)
+    plot_service_breakdown(output_dir, *_critical_breakdown(data_dir))
+    plot_counter_utilization(output_dir, _event_timeline(data_dir))
+    plot_queue_velocity(snapshots, output_dir)
+    plot_predictive_demand(output_dir)
+    paths = [os.path.join(output_dir, name) for name in CHARTS]
+
+    if os.path.exists(os.path.join(data_dir, "demo_series_index.json")):
+        paths += [plot_metric_series(data_dir, metric, output_dir) for metric in SERIES_CHARTS]
+    return paths
+
+
+if __name__ == "__main__":
+    render_all()
+
+    print("All visualizations generated successfully!")
+    print("\nGenerated files:")
+    for name in CHARTS:
+        print(f"- {name}")
@@ -0,0 +1,185 @@
+"""
+BleSaf Live Simulation Feed
+Runs a scenario in paced real time (1x, 10x, 60x...) and pushes the branch
+state to any number of dashboards over Server-Sent Events
+
+    python live_feed.py --speed 60
+    // in a mockup:
+    new EventSource("http://localhost:8765/events")
+        .addEventListener("state", e => render(JSON.parse(e.data)))
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+HEARTBEAT_SECONDS = 15
+CLIENT_BUFFER = 8  # states kept for a slow client before the oldest is dropped
+
+
+class Broadcaster:
+    """Fan-out of pre-encoded messages to subscriber queues"""
+
+    def __init__(self):
+        self.subscribers = set()
+        self.latest = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=CLIENT_BUFFER)
+        if self.latest is not None:
+            queue.put_nowait(self.latest)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def publish(self, message: bytes, retain: bool = True):
+        """Queue a message for every client without ever awaiting a slow one
+
+        Retained messages (states) are also replayed to clients that join later.
+        """
+        if retain:
+            self.latest = message
+        for queue in self.subscribers:
+            if queue.full():
+                # A lagging dashboard only needs the newest state, not every step
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+
+def _sse(event: str, payload: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n".encode("utf-8")
+
+
+class LiveSimulation:
+    """Advances a compiled scenario at `speed` simulated seconds per real second"""
+
+    def __init__(self, scenario_path=None, speed: float = 1.0, seed: int = None, loop_forever: bool = False):
+        from scenario import DEMO_SCENARIO_PATH, compile_scenario, load_scenario
+
+        self.compiled = compile_scenario(load_scenario(scenario_path or DEMO_SCENARIO_PATH))
+        self.speed = speed
+        self.seed = seed
+        self.loop_forever = loop_forever
+        self.broadcaster = Broadcaster()
+        # One worker thread owns the simulator: steps never run on the event loop
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="simulation")
+        self.sim = None
+
+    def _reset(self):
+        from enhanced_simulation import EnhancedSimulator
+        if self.seed is not None:
+            random.seed(self.seed)
+        self.sim = EnhancedSimulator()
+
+    def _step(self, minute: int) -> bytes:
+        """Run one simulated minute and encode the resulting state (worker thread)"""
+        from scenario import run_scenario
+        run_scenario(self.sim, self.compiled, start_minute=minute, end_minute=minute, verbose=False)
+        state = self.sim.current_state()
+        return _sse("state", {"minute": minute, "speed": self.speed, "state": state})
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await loop.run_in_executor(self.executor, self._reset)
+            started = loop.time()
+            elapsed = 0.0  # simulated seconds already paced, survives speed changes
+            for minute in range(self.compiled.duration + 1):
+                message = await loop.run_in_executor(self.executor, self._step, minute)
+                self.broadcaster.publish(message)
+
+                # Sleep until this minute's wall-clock deadline (no drift accumulation)
+                elapsed += 60 / self.speed
+                delay = started + elapsed - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    started -= delay  # running behind: rebase instead of bursting
+
+            end = self.compiled.start + timedelta(minutes=self.compiled.duration)
+            self.broadcaster.publish(_sse("end", {"time": end.strftime("%H:%M")}), retain=False)
+            if not self.loop_forever:
+                return
+
+    async def handle_client(self, reader, writer):
+        """Minimal HTTP: GET /events (SSE stream), /state (latest state), /speed?value=N"""
+        try:
+            request = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # skip request headers
+            parts = request.decode("latin-1").split()
+            path, _, query = (parts[1] if len(parts) > 1 else "/").partition("?")
+
+            if path == "/events":
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                             b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n"
+                             b"Access-Control-Allow-Origin: *\r\n\r\n")
+                queue = self.broadcaster.subscribe()
+                try:
+                    while True:
+                        try:
+                            message = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+                        except asyncio.TimeoutError:
+                            message = b": heartbeat\n\n"
+                        writer.write(message)
+                        await writer.drain()
+                finally:
+                    self.broadcaster.unsubscribe(queue)
+            elif path == "/state" and self.broadcaster.latest is not None:
+                data = self.broadcaster.latest.split(b"data: ", 1)[1].strip()
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Access-Control-Allow-Origin: *\r\n"
+                             b"Content-Length: " + str(len(data)).encode() + b"\r\n\r\n" + data)
+                await writer.drain()
+            elif path == "/speed" and query.startswith("value="):
+                try:
+                    # Takes effect from the next simulated minute
+                    self.speed = max(0.1, float(query[len("value="):]))
+                except ValueError:
+                    writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+                    await writer.drain()
+                    return
+                body = json.dumps({"speed": self.speed}).encode("utf-8")
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Access-Control-Allow-Origin: *\r\n"
+                             b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+                await writer.drain()
+            else:
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host="127.0.0.1", port=8765, **kwargs):
+    live = LiveSimulation(**kwargs)
+    server = await asyncio.start_server(live.handle_client, host, port)
+    print(f"Live feed on http://{host}:{port}/events (speed {live.speed}x)")
+    async with server:
+        await live.run()
+        # Keep serving the final state to late clients until interrupted
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Paced live simulation feed for the dashboard mockups")
+    parser.add_argument("--scenario", help="scenario file (default: demo_scenario.json)")
+    parser.add_argument("--speed", type=float, default=60.0, help="simulated seconds per real second (1, 10, 60...)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--loop", action="store_true", help="restart the scenario when it ends")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, scenario_path=args.scenario, speed=args.speed,
+                          seed=args.seed, loop_forever=args.loop))
+    except KeyboardInterrupt:
+        pass
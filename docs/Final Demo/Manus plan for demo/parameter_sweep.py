@@ -0,0 +1,246 @@
+"""
+BleSaf Parameter Sweeps
+Runs the demo scenario over grids or Latin-hypercube samples of staffing,
+arrival and service-mix parameters, with an on-disk content-addressed cache
+"""
+
+import copy
+import hashlib
+import itertools
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_CACHE_DIR = "/home/ubuntu/blesaf_analysis/sweep_cache"
+SLA_THRESHOLD = 15  # minutes
+
+# Source files whose content determines simulation results: the front-end,
+# the scenario compiler, the shared engine and the wait sketches it feeds
+_CODE_FILES = ["enhanced_simulation.py", "scenario.py", "simulation_core.py", "quantile_sketch.py"]
+_code_version = None
+
+
+def code_version() -> str:
+    """Hash of the simulator sources, part of every cache key"""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        here = os.path.dirname(os.path.abspath(__file__))
+        for name in _CODE_FILES:
+            with open(os.path.join(here, name), "rb") as f:
+                digest.update(f.read())
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+
+# === Sweep axes ===
+# Each axis edits a copy of the run config: {"services", "tellers", "scenario", "arrival_scale"}
+
+def _axis_counters(config, value):
+    """Number of counters staffed for the whole scenario
+
+    The first `value` counters open at the start; scripted openings of any
+    other counter are dropped, scripted breaks of the staffed ones are kept.
+    """
+    value = int(value)
+    tellers = config["tellers"]
+    for n in range(len(tellers) + 1, value + 1):
+        tellers[f"G{n}"] = {"name": f"Guichet {n}", "efficiency": 1.0}
+    opening = list(tellers.keys())[:value]
+    actions = [a for a in config["scenario"].get("tellers", [])
+               if a["at"] > 0 and a.get("activate", a.get("deactivate")) in opening]
+    config["scenario"]["tellers"] = [{"at": 0, "activate": t} for t in opening] + actions
+    # Customers scripted at a counter that is now closed start in the queue
+    for injection in config["scenario"].get("injections", []):
+        if injection.get("teller") and injection["teller"] not in opening:
+            for key in ("teller", "started", "ends"):
+                injection.pop(key, None)
+
+
+def _axis_arrival_scale(config, value):
+    """Multiplier on every arrival rule of the scenario"""
+    config["arrival_scale"] = float(value)
+
+
+def _axis_efficiency(config, value):
+    """Multiplier on every teller's efficiency factor"""
+    for teller in config["tellers"].values():
+        teller["efficiency"] *= float(value)
+
+
+def _axis_share(config, value, service):
+    """Share of arrivals for one service, the other services are rescaled"""
+    services = config["services"]
+    if service not in services:
+        raise ValueError(f"Unknown service for share axis: {service}")
+    others = sum(s["weight"] for name, s in services.items() if name != service)
+    if others <= 0 and len(services) > 1:
+        raise ValueError(f"Cannot rescale the other services for share:{service}, their weights sum to 0")
+    for name, s in services.items():
+        s["weight"] = float(value) if name == service else s["weight"] * (1 - float(value)) / others
+
+
+AXES = {
+    "counters": _axis_counters,
+    "arrival_scale": _axis_arrival_scale,
+    "efficiency": _axis_efficiency
+}
+
+
+def build_config(point: dict, scenario: dict) -> dict:
+    """Resolve a sweep point (axis -> value) into a full run config"""
+    from enhanced_simulation import SERVICES, TELLERS
+
+    config = {
+        "services": copy.deepcopy(SERVICES),
+        "tellers": copy.deepcopy(TELLERS),
+        "scenario": copy.deepcopy(scenario),
+        "arrival_scale": 1.0
+    }
+    for axis, value in point.items():
+        if axis.startswith("share:"):
+            _axis_share(config, value, axis[len("share:"):])
+        elif axis in AXES:
+            AXES[axis](config, value)
+        else:
+            raise ValueError(f"Unknown sweep axis: {axis}")
+    return config
+
+
+def cache_key(config: dict, seed: int) -> str:
+    """Content address of one run: config + seed + code version"""
+    blob = json.dumps({"config": config, "seed": seed, "code": code_version()},
+                      sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def grid_points(axes: dict) -> list:
+    """Cartesian product of the value lists of each axis"""
+    names = list(axes.keys())
+    return [dict(zip(names, values)) for values in itertools.product(*axes.values())]
+
+
+def latin_hypercube_points(axes: dict, samples: int, seed: int = 0) -> list:
+    """Latin-hypercube sample; an axis is a (low, high) range or a list of choices"""
+    rng = random.Random(seed)
+    columns = {}
+    for name, spec in axes.items():
+        strata = list(range(samples))
+        rng.shuffle(strata)
+        u = [(s + rng.random()) / samples for s in strata]
+        if isinstance(spec, tuple):
+            low, high = spec
+            values = [low + x * (high - low) for x in u]
+            if isinstance(low, int) and isinstance(high, int):
+                values = [int(round(v)) for v in values]
+        else:
+            values = [spec[min(int(x * len(spec)), len(spec) - 1)] for x in u]
+        columns[name] = values
+    return [{name: columns[name][i] for name in axes} for i in range(samples)]
+
+
+def run_point(config: dict, seed: int) -> dict:
+    """Run the scenario once for a resolved config and summarize the outcome"""
+    from enhanced_simulation import EnhancedSimulator
+    from scenario import compile_scenario, run_scenario
+
+    random.seed(seed)
+    compiled = compile_scenario(config["scenario"], config["services"], config["arrival_scale"])
+    sim = EnhancedSimulator(config["services"], config["tellers"])
+    peak = [0]
+
+    def track_peak(sim, minute):
+        peak[0] = max(peak[0], len(sim.queue))
+
+    run_scenario(sim, compiled, verbose=False, on_minute=track_peak)
+
+    waits = [(c["service_start"] - c["wait_start"]).total_seconds() / 60 for c in sim.served]
+    return {
+        "customers": len(sim.customers),
+        "served": len(sim.served),
+        "still_waiting": len(sim.queue),
+        "avg_wait": round(sum(waits) / len(waits), 2) if waits else 0,
+        "max_wait": round(max(waits), 2) if waits else 0,
+        "sla_compliance": round(sum(1 for w in waits if w <= SLA_THRESHOLD) / len(waits) * 100, 1) if waits else 100,
+        "peak_queue": peak[0]
+    }
+
+
+def _cache_path(cache_dir, key):
+    return os.path.join(cache_dir, key[:2], f"{key}.json")
+
+
+def _run_job(job):
+    """Worker entry point: run one (config, seed) and store it in the cache"""
+    key, config, seed, cache_dir = job
+    metrics = run_point(config, seed)
+    path = _cache_path(cache_dir, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(metrics, f)
+    os.replace(tmp, path)
+    return key, metrics
+
+
+def run_sweep(axes: dict, method: str = "grid", samples: int = 10, seeds=(0,),
+              scenario_path: str = None, cache_dir: str = DEFAULT_CACHE_DIR,
+              workers: int = None, sample_seed: int = 0) -> list:
+    """Run every sweep point x seed, computing only the runs missing from the cache
+
+    Returns one row per run: the point's axis values, the seed, the metrics
+    and whether the result came from the cache.
+    """
+    from scenario import DEMO_SCENARIO_PATH, load_scenario
+
+    scenario = load_scenario(scenario_path or DEMO_SCENARIO_PATH)
+    if method == "grid":
+        points = grid_points(axes)
+    elif method == "lhs":
+        points = latin_hypercube_points(axes, samples, sample_seed)
+    else:
+        raise ValueError(f"Unknown sweep method: {method}")
+
+    rows, jobs, results = [], {}, {}
+    for point in points:
+        config = build_config(point, scenario)
+        for seed in seeds:
+            key = cache_key(config, seed)
+            rows.append((point, seed, key))
+            path = _cache_path(cache_dir, key)
+            if os.path.exists(path):
+                with open(path) as f:
+                    results[key] = json.load(f)
+            elif key not in jobs:
+                jobs[key] = (key, config, seed, cache_dir)
+
+    cached = set(results)
+    print(f"Sweep: {len(rows)} runs, {len(cached)} cached, {len(jobs)} to compute")
+
+    if jobs:
+        if workers == 1:
+            computed = map(_run_job, jobs.values())
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            computed = executor.map(_run_job, jobs.values(), chunksize=4)
+        try:
+            for key, metrics in computed:
+                results[key] = metrics
+        finally:
+            if workers != 1:
+                executor.shutdown(cancel_futures=True)
+
+    return [dict(point, seed=seed, cached=key in cached, **results[key]) for point, seed, key in rows]
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    rows = run_sweep(
+        {"counters": [2, 3, 4], "arrival_scale": [0.8, 1.0, 1.2], "share:Consultation": [0.15, 0.30]},
+        seeds=range(5)
+    )
+    df = pd.DataFrame(rows)
+    summary = df.groupby(["counters", "arrival_scale", "share:Consultation"])[["sla_compliance", "avg_wait", "peak_queue"]].mean()
+    print(summary.round(1).to_string())
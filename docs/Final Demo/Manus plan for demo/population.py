@@ -0,0 +1,135 @@
+"""
+BleSaf Synthetic Population
+Generates millions of synthetic customers (names, unique tickets, service
+draws) as arrays, chunk by chunk, straight to CSV or Parquet for load
+testing the web/API apps
+
+    python population.py 5000000 -o customers.parquet --seed 7
+"""
+
+import argparse
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 1_000_000
+
+
+def _ascii_letters(name: str) -> str:
+    folded = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return "".join(ch for ch in folded.upper() if ch.isalpha())
+
+
+def unique_prefixes(services: dict) -> dict:
+    """Ticket prefix per service, extended where two services share one
+
+    The demo configuration gives "R" to both Retrait d'espèces and Relevés de
+    compte; the later service gets the next letters of its name ("RE"), so
+    every ticket identifies its service.
+    """
+    prefixes = {}
+    taken = set()
+    for service, props in services.items():
+        letters = _ascii_letters(service)
+        prefix = props.get("prefix") or letters[:1]
+        for letter in letters[len(prefix):]:
+            if prefix not in taken:
+                break
+            prefix += letter
+        if prefix in taken:
+            raise ValueError(f"No collision-free ticket prefix for {service}")
+        prefixes[service] = prefix
+        taken.add(prefix)
+    return prefixes
+
+
+def _weights(services: dict) -> np.ndarray:
+    # EnhancedSimulator configs carry "weight", CustomerFlowSimulator ones "frequency"
+    weights = np.array([props.get("weight", props.get("frequency", 0)) for props in services.values()], dtype=float)
+    return weights / weights.sum()
+
+
+def generate_population(count: int, services: dict = None, first_names=None, last_names=None,
+                        seed: int = None, chunk_rows: int = CHUNK_ROWS):
+    """Yield DataFrames of synthetic customers (ID, Name, Ticket, Service)
+
+    Each chunk is drawn in one pass with numpy: names index a precomputed
+    first x last name table, services are drawn from the configured weights
+    and ticket numbers continue per-prefix counters across chunks.
+    """
+    if services is None:
+        from enhanced_simulation import SERVICES
+        services = SERVICES
+    if first_names is None or last_names is None:
+        from enhanced_simulation import FIRST_NAMES, LAST_NAMES
+        first_names = first_names or FIRST_NAMES
+        last_names = last_names or LAST_NAMES
+
+    rng = np.random.default_rng(seed)
+    names = [f"{first} {last}" for first in first_names for last in last_names]
+    service_names = list(services)
+    prefixes = unique_prefixes(services)
+    prefix_table = np.array([f"{prefixes[s]}-" for s in service_names])
+    cum_weights = np.cumsum(_weights(services))
+    counters = np.zeros(len(service_names), dtype=np.int64)
+
+    for first_id in range(0, count, chunk_rows):
+        n = min(chunk_rows, count - first_id)
+        codes = np.minimum(np.searchsorted(cum_weights, rng.random(n), side="right"), len(service_names) - 1)
+
+        numbers = np.empty(n, dtype=np.int64)
+        for code in range(len(service_names)):
+            rows = np.flatnonzero(codes == code)
+            numbers[rows] = counters[code] + np.arange(1, len(rows) + 1)
+            counters[code] += len(rows)
+        tickets = np.char.add(prefix_table[codes], np.char.zfill(numbers.astype(str), 3))
+
+        yield pd.DataFrame({
+            "ID": np.arange(first_id + 1, first_id + n + 1),
+            "Name": pd.Categorical.from_codes(rng.integers(0, len(names), n), names),
+            "Ticket": tickets,
+            "Service": pd.Categorical.from_codes(codes, service_names)
+        })
+
+
+def write_population(path: str, count: int, **kwargs) -> int:
+    """Stream a population to .csv or .parquet (pyarrow) without holding it in memory"""
+    chunks = generate_population(count, **kwargs)
+    written = 0
+    if path.endswith(".parquet"):
+        import pyarrow as pa  # optional, only needed for Parquet output
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                written += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            for chunk in chunks:
+                chunk.to_csv(f, header=written == 0, index=False)
+                written += len(chunk)
+    return written
+
+
+if __name__ == "__main__":
+    import time
+
+    parser = argparse.ArgumentParser(description="Generate a large synthetic customer population")
+    parser.add_argument("count", type=int, help="number of customers")
+    parser.add_argument("-o", "--output", default="synthetic_customers.csv", help=".csv or .parquet")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = write_population(args.output, args.count, seed=args.seed, chunk_rows=args.chunk_rows)
+    print(f"{written} customers written to {args.output} in {time.perf_counter() - start:.2f}s")
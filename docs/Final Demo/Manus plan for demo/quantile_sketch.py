@@ -0,0 +1,197 @@
+"""
+BleSaf Wait-Time Quantile Sketches
+Mergeable streaming sketches (DDSketch-style logarithmic buckets) giving
+p50/p90/p99 wait times per branch, service and teller in bounded memory
+"""
+
+import math
+
+DEFAULT_ACCURACY = 0.01   # quantiles within 1% of the true value
+DEFAULT_MAX_BINS = 2048   # per sign; the smallest buckets collapse beyond this
+ZERO_THRESHOLD = 1e-3     # minutes; smaller waits count as zero
+
+
+class QuantileSketch:
+    """Relative-error quantile sketch over positive, zero and negative values"""
+
+    def __init__(self, relative_accuracy: float = DEFAULT_ACCURACY, max_bins: int = DEFAULT_MAX_BINS):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zero = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, value):
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, index):
+        # Midpoint (in relative terms) of the bucket (gamma^(i-1), gamma^i]
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def _collapse(self, bins):
+        """Merge the lowest buckets so the store never exceeds max_bins"""
+        if len(bins) <= self.max_bins:
+            return
+        keys = sorted(bins)
+        excess = keys[:len(keys) - self.max_bins + 1]
+        total = sum(bins.pop(k) for k in excess)
+        bins[excess[-1]] = total
+
+    def add(self, value: float, weight: int = 1):
+        self.count += weight
+        self.sum += value * weight
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value > ZERO_THRESHOLD:
+            index = self._index(value)
+            self.positive[index] = self.positive.get(index, 0) + weight
+            self._collapse(self.positive)
+        elif value < -ZERO_THRESHOLD:
+            index = self._index(-value)
+            self.negative[index] = self.negative.get(index, 0) + weight
+            self._collapse(self.negative)
+        else:
+            self.zero += weight
+
+    def merge(self, other: "QuantileSketch"):
+        """Fold another sketch (same accuracy) into this one"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for index, n in other.positive.items():
+            self.positive[index] = self.positive.get(index, 0) + n
+        for index, n in other.negative.items():
+            self.negative[index] = self.negative.get(index, 0) + n
+        self._collapse(self.positive)
+        self._collapse(self.negative)
+        self.zero += other.zero
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q: float):
+        """Value at quantile q in [0, 1], None for an empty sketch"""
+        if self.count == 0:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+
+        seen = 0
+        # Negative values: largest magnitude first
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return max(self.min, -self._value(index))
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return min(self.max, self._value(index))
+        return self.max
+
+    def mean(self):
+        return self.sum / self.count if self.count else None
+
+    def to_dict(self) -> dict:
+        """JSON-friendly form, e.g. to ship sketches between processes or branches"""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_bins": self.max_bins,
+            "positive": self.positive,
+            "negative": self.negative,
+            "zero": self.zero,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"], data["max_bins"])
+        sketch.positive = {int(k): v for k, v in data["positive"].items()}
+        sketch.negative = {int(k): v for k, v in data["negative"].items()}
+        sketch.zero = data["zero"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        if data["count"]:
+            sketch.min, sketch.max = data["min"], data["max"]
+        return sketch
+
+
+class WaitTimeSketches:
+    """Wait-time sketches of one or more branches, keyed per branch, service and teller
+
+    Keys are ("branch", branch), ("service", branch, service) and
+    ("teller", branch, teller_id), so merging the sketches of several
+    branches (or replications) keeps each branch separate, and combined()
+    folds them into network-wide figures on demand.
+    """
+
+    def __init__(self, branch: str, relative_accuracy: float = DEFAULT_ACCURACY):
+        self.branch = branch
+        self.relative_accuracy = relative_accuracy
+        self.sketches = {}
+
+    def _sketch(self, key):
+        sketch = self.sketches.get(key)
+        if sketch is None:
+            sketch = self.sketches[key] = QuantileSketch(self.relative_accuracy)
+        return sketch
+
+    def add(self, wait: float, service: str, teller_id: str):
+        """Record the wait of a served customer"""
+        self._sketch(("branch", self.branch)).add(wait)
+        self._sketch(("service", self.branch, service)).add(wait)
+        self._sketch(("teller", self.branch, teller_id)).add(wait)
+
+    def merge(self, other: "WaitTimeSketches"):
+        for key, sketch in other.sketches.items():
+            self._sketch(key).merge(sketch)
+        return self
+
+    def get(self, kind: str, name: str = None, branch: str = None) -> QuantileSketch:
+        """Sketch for a branch, or a service/teller within it (this branch by default)"""
+        branch = branch or self.branch
+        key = ("branch", branch) if kind == "branch" else (kind, branch, name)
+        return self.sketches.get(key) or QuantileSketch(self.relative_accuracy)
+
+    def combined(self, kind: str, name: str = None) -> QuantileSketch:
+        """Merge a dimension across every branch (network-wide percentiles)"""
+        merged = QuantileSketch(self.relative_accuracy)
+        for key, sketch in self.sketches.items():
+            if key[0] == kind and (name is None or key[-1] == name):
+                merged.merge(sketch)
+        return merged
+
+    def percentiles(self, kind: str = "branch", name: str = None, branch: str = None) -> dict:
+        sketch = self.get(kind, name, branch)
+        return {f"p{int(q * 100)}": sketch.quantile(q) for q in (0.5, 0.9, 0.99)}
+
+    def to_dict(self) -> dict:
+        return {
+            "branch": self.branch,
+            "relative_accuracy": self.relative_accuracy,
+            "sketches": [[list(key), sketch.to_dict()] for key, sketch in self.sketches.items()]
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "WaitTimeSketches":
+        sketches = cls(data["branch"], data["relative_accuracy"])
+        for key, sketch in data["sketches"]:
+            sketches.sketches[tuple(key)] = QuantileSketch.from_dict(sketch)
+        return sketches
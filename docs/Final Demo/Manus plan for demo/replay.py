@@ -0,0 +1,234 @@
+"""
+BleSaf Trace Replay
+Replays recorded customers (demo_customers.csv-shaped exports or larger
+histories) through the EnhancedSimulator under an alternative staffing plan:
+"what if G3 had opened at 08:30 last Tuesday" against real traffic
+
+    python replay.py history.csv --date 2024-10-22 --activate G3@30
+"""
+
+import argparse
+import heapq
+import math
+
+import numpy as np
+import pandas as pd
+
+from calibrate import COLUMN_ALIASES, clock_seconds
+from quantile_sketch import QuantileSketch
+
+CHUNK_ROWS = 50_000
+REORDER_SECONDS = 120  # exports are in ticket order, arrivals can be a little out of order
+SLA_MINUTES = 15
+
+
+def iter_trace(path, date=None, branch=None, chunk_rows: int = CHUNK_ROWS):
+    """Stream a trace from disk as numeric chunks, one pandas chunk at a time
+
+    Yields DataFrames with arrival_s/start_s/end_s (seconds since midnight,
+    NaN when missing) plus Name, Service and Teller. date and branch filter
+    histories that carry Date/Branch columns.
+    """
+    reader = pd.read_csv(path, dtype=str, chunksize=chunk_rows, keep_default_na=False, na_values=[""])
+    for chunk in reader:
+        chunk = chunk.rename(columns=COLUMN_ALIASES)
+        if date is not None and "Date" in chunk:
+            chunk = chunk[chunk["Date"] == str(date)]
+        if branch is not None and "Branch" in chunk:
+            chunk = chunk[chunk["Branch"] == branch]
+        if chunk.empty:
+            continue
+        yield pd.DataFrame({
+            "arrival_s": clock_seconds(chunk["Arrival"]),
+            "start_s": clock_seconds(chunk["Service Start"]),
+            "end_s": clock_seconds(chunk["Service End"]),
+            "name": chunk["Name"].to_numpy() if "Name" in chunk else None,
+            "service": chunk["Service"].to_numpy(),
+            "teller": chunk["Teller"].to_numpy()
+        })
+
+
+def observed_staffing(path, start_minute_of_day: int, duration: int, date=None, branch=None) -> list:
+    """Teller activations as recorded: each counter opens at its first service in the window
+
+    Returns scenario "tellers" entries, ready to edit into a what-if plan.
+    Breaks cannot be told apart from idle time in an export, so no
+    deactivations are inferred.
+    """
+    first = {}
+    window_start, window_end = start_minute_of_day * 60, (start_minute_of_day + duration) * 60
+    for chunk in iter_trace(path, date, branch):
+        served = chunk[(chunk["start_s"] >= window_start) & (chunk["start_s"] < window_end)]
+        for teller, start in served.groupby("teller")["start_s"].min().items():
+            first[teller] = min(start, first.get(teller, math.inf))
+    return [
+        {"at": int(start - window_start) // 60, "activate": teller}
+        for teller, start in sorted(first.items(), key=lambda item: item[1])
+    ]
+
+
+class TraceFeed:
+    """Feeds recorded arrivals to run_scenario minute by minute
+
+    Only the reorder window is held in memory; rows are read chunk by chunk
+    as the simulation clock reaches them. Recorded service durations are
+    normalized by the efficiency of the teller who served them, so a
+    different teller serves the same work at their own pace. Customers
+    never served in the trace get a random duration as usual.
+    """
+
+    def __init__(self, path, compiled, tellers: dict, date=None, branch=None, chunk_rows: int = CHUNK_ROWS):
+        start = compiled.start
+        self.window_start = start.hour * 3600 + start.minute * 60
+        self.window_end = self.window_start + (compiled.duration + 1) * 60
+        self.tellers = tellers
+        self.chunks = iter_trace(path, date, branch, chunk_rows)
+        self.pending = []  # heap of (arrival_s, seq, name, service, base_duration, recorded wait)
+        self.read_until = -math.inf
+        self.seq = 0
+        self.exhausted = False
+        self.replayed = 0
+        # Simulator customer id -> recorded wait (None if never served in the trace)
+        self.recorded_waits = {}
+
+    def _read_chunk(self):
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.exhausted = True
+            return
+        arrival = chunk["arrival_s"].to_numpy()
+        in_window = (arrival >= self.window_start) & (arrival < self.window_end)
+        if len(arrival):
+            self.read_until = max(self.read_until, np.nanmax(arrival))
+        chunk = chunk[in_window]
+
+        efficiency = chunk["teller"].map(lambda t: self.tellers.get(t, {}).get("efficiency", 1.0)).to_numpy()
+        base = (chunk["end_s"].to_numpy() - chunk["start_s"].to_numpy()) / 60 * efficiency
+        wait = (chunk["start_s"].to_numpy() - chunk["arrival_s"].to_numpy()) / 60
+        names = chunk["name"].to_numpy()
+
+        for i, (arrival_s, service) in enumerate(zip(chunk["arrival_s"].to_numpy(), chunk["service"].to_numpy())):
+            duration = float(base[i]) if base[i] > 0 else None
+            recorded = None if math.isnan(wait[i]) else max(0.0, float(wait[i]))
+            heapq.heappush(self.pending, (float(arrival_s), self.seq, names[i], service, duration, recorded))
+            self.seq += 1
+
+    def __call__(self, sim, minute: int):
+        now = self.window_start + minute * 60
+        minute_end = now + 60
+        while not self.exhausted and self.read_until < minute_end + REORDER_SECONDS:
+            self._read_chunk()
+
+        while self.pending and self.pending[0][0] < minute_end:
+            arrival_s, _, name, service, base_duration, recorded = heapq.heappop(self.pending)
+            if service not in sim.services:
+                raise ValueError(f"Unknown service in trace: {service}")
+            customer = sim.add_customer(service, int(arrival_s - now), name=name if isinstance(name, str) else None,
+                                        base_duration=base_duration)
+            self.recorded_waits[customer["id"]] = recorded
+            self.replayed += 1
+
+
+def replay(path, staffing: dict, date=None, branch=None, services=None, tellers=None,
+           chunk_rows: int = CHUNK_ROWS, verbose: bool = False):
+    """Run a trace under a staffing scenario; returns (simulator, feed)
+
+    staffing is a scenario spec (see scenario.py) whose start/duration set the
+    replayed window; its tellers and snapshots apply as usual and any phases
+    add synthetic arrivals on top of the recorded ones.
+    """
+    from enhanced_simulation import EnhancedSimulator
+    from scenario import compile_scenario, run_scenario
+
+    sim = EnhancedSimulator(services=services, tellers=tellers)
+    compiled = compile_scenario(staffing, sim.services)
+    feed = TraceFeed(path, compiled, sim.tellers, date, branch, chunk_rows)
+    run_scenario(sim, compiled, verbose=verbose, feed=feed)
+    return sim, feed
+
+
+def summarize(sim, feed) -> dict:
+    """Recorded vs replayed waits of the same customers
+
+    Only recorded customers whose service started on both sides (completed
+    or still at the counter) are compared; the ones started on one side
+    only, and synthetic arrivals, are counted apart.
+    """
+    sketches = {"recorded": QuantileSketch(), "replayed": QuantileSketch()}
+    sla = {"recorded": 0, "replayed": 0}
+    recorded_only = replayed_only = 0
+    for customer_id, recorded in feed.recorded_waits.items():
+        c = sim.customers[customer_id - 1]
+        if recorded is None or not c["service_start"]:
+            recorded_only += recorded is not None
+            replayed_only += bool(c["service_start"])
+            continue
+        replayed = max(0.0, (c["service_start"] - c["wait_start"]).total_seconds() / 60)
+        for label, wait in (("recorded", recorded), ("replayed", replayed)):
+            sketches[label].add(wait)
+            sla[label] += wait <= SLA_MINUTES
+
+    summary = {"customers": feed.replayed, "compared": sketches["recorded"].count,
+               "served_recorded_only": recorded_only, "served_replayed_only": replayed_only}
+    for label, sketch in sketches.items():
+        summary[label] = {
+            "served": sketch.count,
+            "avg_wait": round(sketch.mean() or 0, 1),
+            "p90_wait": round(sketch.quantile(0.9) or 0, 1),
+            "sla_compliance": round(100 * sla[label] / sketch.count, 1) if sketch.count else 100
+        }
+    summary["replayed"]["still_waiting"] = len(sim.queue)
+    return summary
+
+
+def _teller_change(value):
+    teller, _, minute = value.partition("@")
+    return teller, int(minute or 0)
+
+
+if __name__ == "__main__":
+    from scenario import load_scenario
+
+    parser = argparse.ArgumentParser(description="Replay a recorded customer trace under a staffing scenario")
+    parser.add_argument("trace", help="customer CSV (demo_customers.csv or a history with Date/Branch columns)")
+    parser.add_argument("--date", help="day to replay when the trace has a Date column")
+    parser.add_argument("--branch", help="branch to replay when the trace has a Branch column")
+    parser.add_argument("--start", default="08:00", help="window start, HH:MM (default 08:00)")
+    parser.add_argument("--duration", type=int, default=480, help="window length in minutes")
+    parser.add_argument("--staffing", help="scenario file with the staffing plan (default: as recorded)")
+    parser.add_argument("--activate", type=_teller_change, action="append", default=[], metavar="G3@30",
+                        help="open a counter at a minute of the window (repeatable)")
+    parser.add_argument("--deactivate", type=_teller_change, action="append", default=[], metavar="G2@45",
+                        help="close a counter at a minute of the window (repeatable)")
+    parser.add_argument("--config", help="calibrated config (see calibrate.py) for services and tellers")
+    args = parser.parse_args()
+
+    if args.staffing:
+        staffing = load_scenario(args.staffing)
+    else:
+        hours, minutes = map(int, args.start.split(":"))
+        staffing = {
+            "name": "Replay",
+            "start": f"{args.date or '2024-10-28'} {args.start}",
+            "duration": args.duration,
+            "tellers": observed_staffing(args.trace, hours * 60 + minutes, args.duration, args.date, args.branch)
+        }
+    staffing["tellers"] = (list(staffing.get("tellers", []))
+                           + [{"at": m, "activate": t} for t, m in args.activate]
+                           + [{"at": m, "deactivate": t} for t, m in args.deactivate])
+
+    services = tellers = None
+    if args.config:
+        from calibrate import load_config
+        config = load_config(args.config)
+        services, tellers = config["services"], config["tellers"]
+
+    sim, feed = replay(args.trace, staffing, args.date, args.branch, services, tellers)
+    summary = summarize(sim, feed)
+    print(f"Replayed {summary['customers']} recorded customers under {len(staffing['tellers'])} teller changes; "
+          f"comparing the {summary['compared']} served on both sides ({summary['served_recorded_only']} served only "
+          f"as recorded, {summary['served_replayed_only']} only in the replay)")
+    for label in ("recorded", "replayed"):
+        s = summary[label]
+        print(f"- {label:8}: served {s['served']}, avg wait {s['avg_wait']} min, "
+              f"P90 {s['p90_wait']} min, SLA {s['sla_compliance']}%")
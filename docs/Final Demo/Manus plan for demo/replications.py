@@ -0,0 +1,214 @@
+"""
+BleSaf Parallel Replications
+Runs many replications of a scenario across processes; each worker writes
+its per-minute snapshot metrics, wait histogram and SLA counts straight into
+preallocated shared-memory NumPy buffers, so nothing but a run index is ever
+pickled back and the parent aggregates the buffers in place
+"""
+
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from snapshot_delta import METRICS
+
+SLA_THRESHOLD = 15      # minutes
+WAIT_BIN_MINUTES = 1
+WAIT_BINS = 121         # 0-120 minutes, the last bin collects longer waits
+
+
+class SharedBuffers:
+    """Named shared-memory arrays that worker processes attach to by name"""
+
+    def __init__(self, shapes: dict, names: dict = None):
+        self.blocks = {}
+        self.arrays = {}
+        self.owner = names is None
+        for key, (shape, dtype) in shapes.items():
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            if self.owner:
+                block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+            elif sys.version_info >= (3, 13):
+                # Attaching workers must not let the resource tracker unlink the parent's block
+                block = shared_memory.SharedMemory(name=names[key], track=False)
+            else:
+                block = shared_memory.SharedMemory(name=names[key])
+            self.blocks[key] = block
+            self.arrays[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            if self.owner:
+                self.arrays[key].fill(0)
+        self.shapes = shapes
+
+    def spec(self):
+        """What a worker needs to attach: (shapes, block names)"""
+        return self.shapes, {key: block.name for key, block in self.blocks.items()}
+
+    def __getitem__(self, key):
+        return self.arrays[key]
+
+    def close(self):
+        self.arrays.clear()  # views must go before the buffers can be released
+        for block in self.blocks.values():
+            block.close()
+            if self.owner:
+                block.unlink()
+        self.blocks.clear()
+
+
+def _buffer_shapes(replications: int, minutes: int) -> dict:
+    return {
+        "minute_metrics": ((replications, minutes, len(METRICS)), np.float64),
+        "wait_histogram": ((replications, WAIT_BINS), np.int64),
+        "sla_counts": ((replications, 2), np.int64)  # served, served within SLA
+    }
+
+
+def _run_replication(job):
+    """Worker: run one replication and write its metrics into the shared buffers"""
+    index, seed, buffer_spec, config = job
+    from enhanced_simulation import EnhancedSimulator
+    from scenario import compile_scenario, load_scenario, run_scenario
+
+    random.seed(seed)
+    sim = EnhancedSimulator(config["services"], config["tellers"])
+    compiled = compile_scenario(load_scenario(config["scenario_path"]), sim.services, config["arrival_scale"])
+
+    buffers = SharedBuffers(*buffer_spec)
+    try:
+        for minute in range(compiled.duration + 1):
+            run_scenario(sim, compiled, start_minute=minute, end_minute=minute, verbose=False)
+            metrics = sim.metrics()
+            buffers["minute_metrics"][index, minute] = [metrics[key] for key in METRICS]
+
+        waits = np.fromiter(((c["service_start"] - c["wait_start"]).total_seconds() / 60 for c in sim.served),
+                            dtype=np.float64, count=len(sim.served))
+        bins = np.clip((np.maximum(waits, 0) // WAIT_BIN_MINUTES).astype(np.int64), 0, WAIT_BINS - 1)
+        buffers["wait_histogram"][index] = np.bincount(bins, minlength=WAIT_BINS)
+        buffers["sla_counts"][index] = (len(waits), int(np.count_nonzero(waits <= SLA_THRESHOLD)))
+    finally:
+        buffers.close()
+    return index
+
+
+class ReplicationResults:
+    """Aggregates over the replication axis, computed on the shared buffers themselves"""
+
+    def __init__(self, buffers: SharedBuffers, start_time):
+        self.buffers = buffers
+        self.start_time = start_time
+
+    @property
+    def minute_metrics(self) -> np.ndarray:
+        """(replications, minutes, metrics) view, columns in snapshot_delta.METRICS order"""
+        return self.buffers["minute_metrics"]
+
+    def metric(self, name: str) -> np.ndarray:
+        """(replications, minutes) view of one metric"""
+        return self.minute_metrics[:, :, METRICS.index(name)]
+
+    def bands(self, name: str, percentiles=(5, 50, 95)) -> dict:
+        """Per-minute mean and percentile band of a metric across replications"""
+        values = self.metric(name)
+        result = {"mean": values.mean(axis=0)}
+        for p, band in zip(percentiles, np.percentile(values, percentiles, axis=0)):
+            result[f"p{p}"] = band
+        return result
+
+    def wait_histogram(self) -> np.ndarray:
+        """Served-customer waits summed over replications, 1-minute bins"""
+        return self.buffers["wait_histogram"].sum(axis=0)
+
+    def wait_quantile(self, q: float) -> float:
+        """Pooled wait quantile from the histogram (bin upper edge)"""
+        histogram = self.wait_histogram()
+        if not histogram.sum():
+            return 0.0
+        cumulative = np.cumsum(histogram)
+        return float((np.searchsorted(cumulative, q * cumulative[-1]) + 1) * WAIT_BIN_MINUTES)
+
+    def sla_compliance(self) -> np.ndarray:
+        """Per-replication SLA compliance (%)"""
+        served, within = self.buffers["sla_counts"].T
+        return np.where(served > 0, 100 * within / np.maximum(served, 1), 100.0)
+
+    def summary(self) -> dict:
+        sla = self.sla_compliance()
+        queue = self.bands("queue_length")
+        peak = int(np.argmax(queue["mean"]))
+        return {
+            "replications": self.minute_metrics.shape[0],
+            "sla_mean": round(float(sla.mean()), 1),
+            "sla_p5": round(float(np.percentile(sla, 5)), 1),
+            "sla_p95": round(float(np.percentile(sla, 95)), 1),
+            "wait_p50": self.wait_quantile(0.5),
+            "wait_p90": self.wait_quantile(0.9),
+            "peak_minute": peak,
+            "peak_queue_mean": round(float(queue["mean"][peak]), 1),
+            "peak_queue_p95": round(float(queue["p95"][peak]), 1)
+        }
+
+    def close(self):
+        self.buffers.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_replications(replications: int, scenario_path: str = None, services: dict = None,
+                     tellers: dict = None, arrival_scale: float = 1.0, seed: int = 0,
+                     workers: int = None) -> ReplicationResults:
+    """Run replications seed, seed+1, ... in worker processes
+
+    Use the result as a context manager (or call close()) to release the
+    shared memory.
+    """
+    from enhanced_simulation import SERVICES, TELLERS
+    from scenario import DEMO_SCENARIO_PATH, compile_scenario, load_scenario
+
+    scenario_path = scenario_path or DEMO_SCENARIO_PATH
+    compiled = compile_scenario(load_scenario(scenario_path), services or SERVICES)
+    config = {"scenario_path": scenario_path, "services": services or SERVICES,
+              "tellers": tellers or TELLERS, "arrival_scale": arrival_scale}
+
+    buffers = SharedBuffers(_buffer_shapes(replications, compiled.duration + 1))
+    jobs = [(i, seed + i, buffers.spec(), config) for i in range(replications)]
+    try:
+        if workers == 1:
+            for job in jobs:
+                _run_replication(job)
+        else:
+            with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+                for _ in executor.map(_run_replication, jobs, chunksize=max(1, replications // 64)):
+                    pass
+    except BaseException:
+        buffers.close()
+        raise
+    return ReplicationResults(buffers, compiled.start)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Run scenario replications in parallel with shared-memory results")
+    parser.add_argument("replications", type=int, nargs="?", default=100)
+    parser.add_argument("--scenario")
+    parser.add_argument("--arrival-scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with run_replications(args.replications, args.scenario, arrival_scale=args.arrival_scale,
+                          seed=args.seed, workers=args.workers) as results:
+        summary = results.summary()
+    print(f"{args.replications} replications in {time.perf_counter() - start:.2f}s")
+    for key, value in summary.items():
+        print(f"- {key}: {value}")
@@ -0,0 +1,249 @@
+"""
+BleSaf Scenario DSL
+Loads declarative demo scenarios (JSON/YAML) and compiles them once into a
+pre-sorted event schedule that drives an EnhancedSimulator minute by minute
+"""
+
+import json
+import math
+import os
+import random
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+DEMO_SCENARIO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "demo_scenario.json")
+
+# Order of scheduled events within a minute. Each tick runs
+# complete_services(), then the events below ASSIGN, then assign_customers(),
+# then the remaining events, so a break or a snapshot sees the assignments of
+# that minute (same order as the original hand-written demo script).
+PRIORITY = {"activate": 0, "inject": 1, "arrivals": 2, "deactivate": 10, "snapshot": 11}
+ASSIGN = 5
+POISSON_CHUNK = 500  # largest rate drawn in one Knuth loop, well clear of exp() underflow
+
+
+class CompiledScenario:
+    """A scenario resolved into a flat, time-ordered event list"""
+
+    def __init__(self, name, start, duration, events, services, cum_weights):
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.events = events
+        self.minutes = [e[0] for e in events]
+        self.services = services
+        self.cum_weights = cum_weights
+
+
+def load_scenario(path: str) -> dict:
+    """Read a scenario spec from a .json or .yaml/.yml file"""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml  # optional, only needed for YAML scenarios
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def _offset(value):
+    """Normalize an offset spec (absent, seconds, or [min, max] seconds)"""
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return (int(value[0]), int(value[1]))
+    return (int(value), int(value))
+
+
+def _compile_arrivals(phase, rule):
+    """Expand one arrival rule of a phase into per-minute arrival events"""
+    first, last = phase["from"], phase["to"]
+    offset = _offset(rule.get("offset"))
+
+    for minute in range(first, last + 1):
+        if "probability" in rule:
+            yield minute, ("probability", float(rule["probability"]), offset)
+        elif "count" in rule:
+            lo, hi = rule["count"] if isinstance(rule["count"], (list, tuple)) else (rule["count"], rule["count"])
+            yield minute, ("count", (int(lo), int(hi)), offset)
+        elif "rate" in rule:
+            # Arrival-rate curve: a constant rate or a [start, end] linear ramp
+            # over the phase, in expected customers per minute (Poisson)
+            rate = rule["rate"]
+            if isinstance(rate, (list, tuple)):
+                span = max(1, last - first)
+                rate = rate[0] + (rate[1] - rate[0]) * (minute - first) / span
+            yield minute, ("rate", float(rate), offset)
+        else:
+            raise ValueError(f"Arrival rule needs probability, count or rate: {rule}")
+
+
+def compile_scenario(spec: dict, services: dict = None, arrival_scale: float = 1.0) -> CompiledScenario:
+    """Compile a scenario spec into a pre-sorted event schedule"""
+    if services is None:
+        from enhanced_simulation import SERVICES
+        services = SERVICES
+
+    raw = []
+    for action in spec.get("tellers", []):
+        kind = "activate" if "activate" in action else "deactivate"
+        raw.append((action["at"], PRIORITY[kind], kind, action[kind]))
+
+    for injection in spec.get("injections", []):
+        if injection["service"] not in services:
+            raise ValueError(f"Unknown service in injection: {injection['service']}")
+        raw.append((injection["at"], PRIORITY["inject"], "inject", (
+            injection["service"],
+            injection.get("offset", 0),
+            injection.get("teller"),
+            injection.get("started", 0),
+            injection.get("ends")
+        )))
+
+    for phase in spec.get("phases", []):
+        for rule in phase.get("arrivals", []):
+            for minute, (mode, param, offset) in _compile_arrivals(phase, rule):
+                if arrival_scale != 1.0:
+                    if mode == "probability":
+                        mode, param = "rate", param * arrival_scale
+                    elif mode == "count":
+                        mode, param = "rate", (param[0] + param[1]) / 2 * arrival_scale
+                    else:
+                        param *= arrival_scale
+                raw.append((minute, PRIORITY["arrivals"], "arrivals", (mode, param, offset)))
+
+    for snapshot in spec.get("snapshots", []):
+        raw.append((snapshot["at"], PRIORITY["snapshot"], "snapshot", snapshot["label"]))
+
+    # Stable sort: events sharing a minute and priority keep their spec order
+    events = sorted(raw, key=lambda e: (e[0], e[1]))
+
+    names = list(services.keys())
+    cum_weights = []
+    total = 0
+    for name in names:
+        total += services[name]["weight"]
+        cum_weights.append(total)
+
+    start = spec["start"]
+    if isinstance(start, str):
+        start = datetime.strptime(start, "%Y-%m-%d %H:%M")
+
+    return CompiledScenario(spec.get("name", ""), start, int(spec["duration"]), events, names, cum_weights)
+
+
+def _poisson(rate):
+    """Draw a Poisson count with the stdlib generator (Knuth)
+
+    exp(-rate) underflows past ~745, so large rates are drawn as a sum of
+    independent draws of at most POISSON_CHUNK each (rates below it draw
+    exactly as before).
+    """
+    count = 0
+    while rate > POISSON_CHUNK:
+        count += _poisson(POISSON_CHUNK)
+        rate -= POISSON_CHUNK
+    limit = math.exp(-rate)
+    product = random.random()
+    while product > limit:
+        count += 1
+        product *= random.random()
+    return count
+
+
+def _draw_offset(offset):
+    if offset is None:
+        return 0
+    if offset[0] == offset[1]:
+        return offset[0]
+    return random.randint(offset[0], offset[1])
+
+
+def _arrive(sim, compiled, offset):
+    service = random.choices(compiled.services, cum_weights=compiled.cum_weights)[0]
+    sim.add_customer(service, _draw_offset(offset))
+
+
+def _apply(sim, compiled, kind, payload, verbose):
+    """Execute one scheduled event against the simulator"""
+    if kind == "arrivals":
+        mode, param, offset = payload
+        if mode == "probability":
+            if random.random() < param:
+                _arrive(sim, compiled, offset)
+        elif mode == "count":
+            for _ in range(random.randint(param[0], param[1])):
+                _arrive(sim, compiled, offset)
+        else:
+            for _ in range(_poisson(param)):
+                _arrive(sim, compiled, offset)
+    elif kind == "activate":
+        sim.activate_teller(payload)
+    elif kind == "deactivate":
+        sim.deactivate_teller(payload)
+    elif kind == "inject":
+        service, offset, teller_id, started, ends = payload
+        if teller_id:
+            # Customer already at the counter when the scenario starts: it
+            # arrived no later than its service began (no negative wait)
+            offset = min(offset, started * 60)
+        customer = sim.add_customer(service, offset)
+        if teller_id:
+            sim.queue.remove(customer)
+            start = sim.current_time + timedelta(minutes=started)
+            sim.start_service(customer, sim.active_tellers[teller_id],
+                              start=start, end=sim.current_time + timedelta(minutes=ends))
+    elif kind == "snapshot":
+        snapshot = sim.take_snapshot(payload)
+        if verbose:
+            print(f"\n{payload}: Queue: {snapshot['queue_length']}, "
+                  f"Being served: {snapshot['being_served']}")
+
+
+def run_scenario(sim, compiled: CompiledScenario, start_minute: int = 0, end_minute: int = None,
+                 verbose: bool = True, feed=None, on_minute=None) -> int:
+    """Run the scheduled minutes [start_minute, end_minute] on the simulator
+
+    Returns the next minute to run, so a scenario can be advanced in chunks
+    (or resumed from a checkpoint) by chaining calls. feed(sim, minute), if
+    given, adds external arrivals (e.g. a recorded trace, see replay.py)
+    together with the scheduled arrivals of each minute; on_minute(sim,
+    minute) is called once each minute is complete (e.g. a
+    timeseries.MinuteSeries recording per-minute metrics).
+    """
+    if end_minute is None:
+        end_minute = compiled.duration
+    events = compiled.events
+    n = len(events)
+    i = bisect_left(compiled.minutes, start_minute)
+
+    for minute in range(start_minute, end_minute + 1):
+        sim.current_time = compiled.start + timedelta(minutes=minute)
+        sim.complete_services()
+
+        while i < n and events[i][0] == minute and events[i][1] < ASSIGN:
+            _apply(sim, compiled, events[i][2], events[i][3], verbose)
+            i += 1
+        if feed:
+            feed(sim, minute)
+
+        sim.assign_customers()
+
+        while i < n and events[i][0] == minute:
+            _apply(sim, compiled, events[i][2], events[i][3], verbose)
+            i += 1
+        if on_minute is not None:
+            on_minute(sim, minute)
+
+    return end_minute + 1
+
+
+if __name__ == "__main__":
+    import sys
+    from enhanced_simulation import EnhancedSimulator
+
+    path = sys.argv[1] if len(sys.argv) > 1 else DEMO_SCENARIO_PATH
+    compiled = compile_scenario(load_scenario(path))
+    print(f"Scenario: {compiled.name} ({len(compiled.events)} scheduled events)")
+
+    sim = EnhancedSimulator()
+    run_scenario(sim, compiled)
+    print(f"\nTotal customers: {len(sim.customers)}, Served: {len(sim.served)}, Still waiting: {len(sim.queue)}")
@@ -0,0 +1,215 @@
+"""
+BleSaf Simulation Profiler
+Opt-in per-phase timing for the simulators: wall time, call counts, events
+per second and peak queue size, with a text report and Chrome-trace export
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+
+# Simulator methods timed when present on the instance. Phases may nest
+# (add_customer runs inside simulate_arrivals); each is charged its own time only
+PHASES = (
+    "complete_services",
+    "simulate_arrivals",
+    "add_customer",
+    "assign_customers",
+    "update_queue_wait_times",
+    "take_snapshot",
+    "get_current_state",
+    "export_data"
+)
+
+MAX_TRACE_EVENTS = 500_000
+
+
+class SimulationProfiler:
+    """Wraps the hot-path methods of one simulator instance while attached
+
+    Nothing is patched until attach() is called, so a simulator that is never
+    profiled runs its plain methods with no overhead at all. Phase times are
+    exclusive: time spent in a nested phase is subtracted from its caller,
+    so the shares never add up to more than 100%.
+    """
+
+    def __init__(self, trace: bool = False):
+        self.trace = trace
+        self.stats = {}
+        self.trace_events = []
+        self.counters = []
+        self.peak_queue = 0
+        self.wall_time = 0.0
+        self.events_processed = 0
+        self._sim = None
+        self._t0 = None
+        self._origin_ns = time.perf_counter_ns()  # Chrome-trace time zero
+        self._baseline = 0
+        self._stack = []  # time spent in nested phases, one entry per active phase
+
+    def _event_count(self, sim):
+        # The event log alone: arrivals, service starts/completions and teller changes
+        # are each logged once there (customers and served would count them again)
+        return len(sim.events)
+
+    def _wrap(self, sim, name, method):
+        stats = self.stats.setdefault(name, [0, 0, 0])  # calls, own ns, max own ns
+        trace = self.trace
+        stack = self._stack
+        perf_counter_ns = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            stack.append(0)
+            start = perf_counter_ns()
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                elapsed = perf_counter_ns() - start
+                own = elapsed - stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+            stats[0] += 1
+            stats[1] += own
+            if own > stats[2]:
+                stats[2] = own
+            queue_length = len(sim.queue)
+            if queue_length > self.peak_queue:
+                self.peak_queue = queue_length
+            if trace and len(self.trace_events) < MAX_TRACE_EVENTS:
+                self.trace_events.append((name, start, elapsed))
+                self.counters.append((start + elapsed, queue_length))
+            return result
+
+        return timed
+
+    def attach(self, sim):
+        """Start timing the simulator's phases"""
+        if self._sim is not None:
+            raise RuntimeError("Profiler is already attached to a simulator")
+        self._sim = sim
+        for name in PHASES:
+            method = getattr(sim, name, None)
+            if method is not None:
+                setattr(sim, name, self._wrap(sim, name, method))
+        self.peak_queue = max(self.peak_queue, len(sim.queue))
+        self._baseline = self._event_count(sim)
+        self._t0 = time.perf_counter()
+        return self
+
+    def detach(self):
+        """Stop timing and restore the simulator's own methods"""
+        sim = self._sim
+        if sim is None:
+            return self
+        for name in PHASES:
+            # Instance attributes shadow the class methods, removing them restores the originals
+            sim.__dict__.pop(name, None)
+        self.wall_time += time.perf_counter() - self._t0
+        self.events_processed += self._event_count(sim) - self._baseline
+        self._sim = None
+        return self
+
+    def summary(self) -> dict:
+        """Per-phase statistics plus run totals, JSON-serializable"""
+        wall_time = self.wall_time
+        events = self.events_processed
+        if self._sim is not None:
+            wall_time += time.perf_counter() - self._t0
+            events += self._event_count(self._sim) - self._baseline
+
+        phases = {}
+        for name, (calls, total_ns, max_ns) in self.stats.items():
+            if calls:
+                phases[name] = {
+                    "calls": calls,
+                    "total_ms": round(total_ns / 1e6, 3),
+                    "mean_us": round(total_ns / calls / 1e3, 2),
+                    "max_us": round(max_ns / 1e3, 2),
+                    "share": round(total_ns / 1e9 / wall_time, 4) if wall_time else 0
+                }
+        return {
+            "wall_time_s": round(wall_time, 4),
+            "events_processed": events,
+            "events_per_second": round(events / wall_time, 1) if wall_time else 0,
+            "peak_queue": self.peak_queue,
+            "phases": phases
+        }
+
+    def report(self) -> str:
+        """Human-readable table of the summary, slowest phase first"""
+        summary = self.summary()
+        lines = [
+            f"Wall time: {summary['wall_time_s']:.3f}s  "
+            f"Events: {summary['events_processed']} ({summary['events_per_second']:.0f}/s)  "
+            f"Peak queue: {summary['peak_queue']}",
+            f"{'Phase':<30}{'Calls':>10}{'Total ms':>12}{'Mean us':>12}{'Max us':>12}{'Share':>8}"
+        ]
+        for name, p in sorted(summary["phases"].items(), key=lambda kv: -kv[1]["total_ms"]):
+            lines.append(f"{name:<30}{p['calls']:>10}{p['total_ms']:>12.2f}{p['mean_us']:>12.1f}"
+                         f"{p['max_us']:>12.1f}{p['share'] * 100:>7.1f}%")
+        return "\n".join(lines)
+
+    def export_json(self, path: str):
+        """Write the summary as JSON, for comparing runs"""
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def export_chrome_trace(self, path: str):
+        """Write recorded calls in Chrome trace format (chrome://tracing, Perfetto)"""
+        if not self.trace:
+            raise RuntimeError("Chrome trace export needs SimulationProfiler(trace=True)")
+        pid = os.getpid()
+        origin = self._origin_ns
+        events = [
+            {"name": name, "cat": "simulation", "ph": "X", "pid": pid, "tid": 0,
+             "ts": (start - origin) / 1e3, "dur": elapsed / 1e3}
+            for name, start, elapsed in self.trace_events
+        ]
+        events.extend(
+            {"name": "queue_length", "ph": "C", "pid": pid, "tid": 0,
+             "ts": (ts - origin) / 1e3, "args": {"waiting": waiting}}
+            for ts, waiting in self.counters
+        )
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms",
+                       "otherData": self.summary()}, f)
+
+
+@contextmanager
+def profiled(sim, trace: bool = False):
+    """Profile a simulator for the duration of a with-block"""
+    profiler = SimulationProfiler(trace=trace).attach(sim)
+    try:
+        yield profiler
+    finally:
+        profiler.detach()
+
+
+def compare_summaries(baseline: dict, current: dict, tolerance: float = 0.10) -> list:
+    """List the phases whose mean time regressed by more than tolerance"""
+    regressions = []
+    for name, phase in current["phases"].items():
+        base = baseline["phases"].get(name)
+        if base and base["mean_us"] > 0:
+            ratio = phase["mean_us"] / base["mean_us"]
+            if ratio > 1 + tolerance:
+                regressions.append({"phase": name, "baseline_us": base["mean_us"],
+                                    "current_us": phase["mean_us"], "ratio": round(ratio, 2)})
+    return regressions
+
+
+if __name__ == "__main__":
+    import sys
+    from enhanced_simulation import EnhancedSimulator
+
+    sim = EnhancedSimulator()
+    with profiled(sim, trace=True) as profiler:
+        sim.run_demo_scenario()
+
+    print("\n=== Profile ===")
+    print(profiler.report())
+
+    if len(sys.argv) > 1:
+        profiler.export_chrome_trace(sys.argv[1])
+        print(f"\nChrome trace written to {sys.argv[1]}")
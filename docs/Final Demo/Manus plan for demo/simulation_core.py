@@ -0,0 +1,358 @@
+"""
+BleSaf Simulation Core
+The branch engine both simulators are built on: tickets, customers, the
+teller model, assignment, service completion, the event log and snapshot
+metrics, with one customer/teller schema
+
+    customer: id, name, ticket, service, arrival_time, wait_start,
+              service_start, service_end, service_duration (min),
+              wait_time (min, set when service starts), teller_id,
+              teller_name, status, base_duration
+    teller:   tellers[id] = {name, efficiency}; active_tellers[id] =
+              {id, name, efficiency, current_customer, service_end_time,
+               total_served, activation_time}
+
+Every event goes through log_event(), which also hands it to the observers
+(e.g. sla_predictor.SlaPredictor). Front-ends (enhanced_simulation.py,
+customer_flow_simulation.py) supply the configuration, the duration model
+and how a day is scripted.
+"""
+
+import abc
+import heapq
+import random
+from datetime import timedelta
+
+from quantile_sketch import WaitTimeSketches
+
+SLA_THRESHOLD = 15  # minutes
+VELOCITY_WINDOW = timedelta(minutes=15)
+
+
+def normalize_tellers(tellers) -> dict:
+    """Teller configuration as {id: {"name", "efficiency", ...}}
+
+    Also accepts the older list form [{"id", "name", "efficiency"}, ...].
+    """
+    if isinstance(tellers, dict):
+        return tellers
+    return {t["id"]: {k: v for k, v in t.items() if k != "id"} for t in tellers}
+
+
+class BranchSimulator(abc.ABC):
+    """Minute-tick queue engine; subclasses set the class attributes below and implement draw_duration"""
+
+    first_names = []
+    last_names = []
+    default_prefixes = {}  # service -> ticket prefix, for services configured without one
+
+    def __init__(self, services: dict, tellers, start_time, branch: str):
+        self.services = services
+        self.tellers = normalize_tellers(tellers)
+        self.prefixes = {s: props.get("prefix", self.default_prefixes.get(s, s[0].upper()))
+                         for s, props in services.items()}
+        self.current_time = start_time
+        self.customers = []
+        self.queue = []
+        self.served = []
+        self.active_tellers = {}
+        self.ticket_counters = {prefix: 1 for prefix in self.prefixes.values()}
+        self.events = []
+        self.snapshots = []
+        # Running totals over served customers, so metrics() does not rescan them
+        self.wait_total = 0.0
+        self.sla_met = 0
+        self.reset_velocity_window()
+        # Wait-time percentiles per branch/service/teller, fed as services complete
+        self.wait_sketches = WaitTimeSketches(branch)
+        self.snapshot_encoder = None
+        # observer(sim, event) callables notified of every logged event (see sla_predictor.py)
+        self.observers = []
+
+    def reset_velocity_window(self):
+        """Rebuild the arrival/completion times metrics() counts queue velocity from
+
+        Min-heaps rather than deques: arrivals within a minute carry random
+        offsets and several counters finish in the same tick, so the times
+        are not appended in order. Entries older than VELOCITY_WINDOW are
+        dropped as the clock advances.
+        """
+        self.recent_arrivals = [c["arrival_time"] for c in self.customers]
+        self.recent_completions = [c["service_end"] for c in self.served if c["service_end"]]
+        heapq.heapify(self.recent_arrivals)
+        heapq.heapify(self.recent_completions)
+
+    @classmethod
+    def from_config(cls, path, **kwargs):
+        """Build a simulator from a calibrated config (see calibrate.py)"""
+        from calibrate import load_config
+        config = load_config(path)
+        return cls(services=config["services"], tellers=config["tellers"], **kwargs)
+
+    def log_event(self, event: dict):
+        """Append an event to the log and hand it to the observers"""
+        self.events.append(event)
+        for observer in self.observers:
+            observer(self, event)
+
+    # Customers
+
+    def random_name(self) -> str:
+        return f"{random.choice(self.first_names)} {random.choice(self.last_names)}"
+
+    def generate_ticket(self, service: str) -> str:
+        prefix = self.prefixes[service]
+        number = self.ticket_counters[prefix]
+        self.ticket_counters[prefix] += 1
+        return f"{prefix}-{number:03d}"
+
+    def add_customer(self, service, offset_seconds=0, name=None, base_duration=None):
+        """Add a customer to the queue
+
+        base_duration (minutes at efficiency 1.0) replaces the random service
+        duration, e.g. for customers replayed from a recorded trace.
+        """
+        arrival_time = self.current_time + timedelta(seconds=offset_seconds)
+        customer = {
+            "id": len(self.customers) + 1,
+            "name": name or self.random_name(),
+            "ticket": self.generate_ticket(service),
+            "service": service,
+            "arrival_time": arrival_time,
+            "wait_start": arrival_time,
+            "service_start": None,
+            "service_end": None,
+            "service_duration": None,
+            "wait_time": None,
+            "teller_id": None,
+            "teller_name": None,
+            "status": "waiting",
+            "base_duration": base_duration
+        }
+        self.customers.append(customer)
+        self.queue.append(customer)
+        heapq.heappush(self.recent_arrivals, arrival_time)
+
+        self.log_event({
+            "time": arrival_time,
+            "type": "arrival",
+            "customer_id": customer["id"],
+            "ticket": customer["ticket"],
+            "service": service,
+            "queue_length": len(self.queue)
+        })
+        return customer
+
+    # Tellers
+
+    def activate_teller(self, teller_id: str):
+        """Open a counter (no-op if it is already open)"""
+        if teller_id in self.active_tellers:
+            return
+        config = self.tellers[teller_id]
+        self.active_tellers[teller_id] = {
+            "id": teller_id,
+            "name": config["name"],
+            "efficiency": config["efficiency"],
+            "current_customer": None,
+            "service_end_time": None,
+            "total_served": 0,
+            "activation_time": self.current_time
+        }
+        self.log_event({
+            "time": self.current_time,
+            "type": "teller_activated",
+            "teller_id": teller_id,
+            "teller_name": config["name"]
+        })
+
+    def deactivate_teller(self, teller_id: str) -> bool:
+        """Close a counter for a break; refused while it is serving someone"""
+        teller = self.active_tellers.get(teller_id)
+        if teller is None or teller["current_customer"] is not None:
+            return False
+        del self.active_tellers[teller_id]
+        self.log_event({
+            "time": self.current_time,
+            "type": "teller_deactivated",
+            "teller_id": teller_id,
+            "reason": "break"
+        })
+        return True
+
+    # Service
+
+    @abc.abstractmethod
+    def draw_duration(self, service: str) -> float:
+        """Random service duration in minutes at efficiency 1.0"""
+
+    def service_duration(self, customer: dict, teller: dict) -> float:
+        """Minutes this teller needs for this customer"""
+        base = customer["base_duration"]
+        if base is None:
+            base = self.draw_duration(customer["service"])
+        return base / teller["efficiency"]
+
+    def start_service(self, customer: dict, teller: dict, start=None, end=None):
+        """Put a customer (already out of the queue) at a counter
+
+        start/end default to now (or the customer's arrival, for a customer
+        arriving later within the current minute) and start +
+        service_duration(); scenarios pass both for customers already at
+        the counter when they begin.
+        """
+        if start is None:
+            start = max(self.current_time, customer["wait_start"])
+        if end is None:
+            duration = self.service_duration(customer, teller)
+            end = start + timedelta(minutes=duration)
+        else:
+            duration = (end - start).total_seconds() / 60
+
+        customer["status"] = "being_served"
+        customer["service_start"] = start
+        customer["service_end"] = end
+        customer["service_duration"] = duration
+        customer["wait_time"] = (start - customer["wait_start"]).total_seconds() / 60
+        customer["teller_id"] = teller["id"]
+        customer["teller_name"] = teller["name"]
+
+        teller["current_customer"] = customer
+        teller["service_end_time"] = end
+
+        self.log_event({
+            "time": start,
+            "type": "service_start",
+            "customer_id": customer["id"],
+            "ticket": customer["ticket"],
+            "teller_id": teller["id"],
+            "teller_name": teller["name"],
+            "wait_time": round(customer["wait_time"], 2),
+            "queue_length": len(self.queue)
+        })
+
+    def assign_customers(self):
+        """Give the head of the queue to every free counter"""
+        for teller in self.active_tellers.values():
+            if teller["current_customer"] is None and self.queue:
+                self.start_service(self.queue.pop(0), teller)
+
+    def complete_services(self):
+        """Release the counters whose service has ended"""
+        for teller in self.active_tellers.values():
+            customer = teller["current_customer"]
+            if customer is not None and self.current_time >= teller["service_end_time"]:
+                customer["status"] = "completed"
+                self.served.append(customer)
+                heapq.heappush(self.recent_completions, customer["service_end"])
+                wait = customer["wait_time"]
+                self.wait_total += wait
+                self.sla_met += wait <= SLA_THRESHOLD
+                self.wait_sketches.add(wait, customer["service"], teller["id"])
+
+                self.log_event({
+                    "time": self.current_time,
+                    "type": "service_complete",
+                    "customer_id": customer["id"],
+                    "ticket": customer["ticket"],
+                    "teller_id": teller["id"],
+                    "service_duration": customer["service_duration"],
+                    "total_time": round((customer["service_end"] - customer["arrival_time"]).total_seconds() / 60, 2)
+                })
+
+                teller["current_customer"] = None
+                teller["service_end_time"] = None
+                teller["total_served"] += 1
+
+    # State
+
+    def metrics(self):
+        """Numeric snapshot metrics for the current time (no lists, cheap enough per minute)"""
+        being_served = sum(1 for t in self.active_tellers.values() if t["current_customer"])
+
+        if self.served:
+            avg_wait = self.wait_total / len(self.served)
+            sla_pct = (self.sla_met / len(self.served)) * 100
+        else:
+            avg_wait = 0
+            sla_pct = 100
+
+        # Queue velocity (customers arriving vs being served in last 15 min)
+        horizon = self.current_time - VELOCITY_WINDOW
+        for times in (self.recent_arrivals, self.recent_completions):
+            while times and times[0] < horizon:
+                heapq.heappop(times)
+        queue_velocity = (len(self.recent_arrivals) - len(self.recent_completions)) * 4  # per hour
+
+        return {
+            "queue_length": len(self.queue),
+            "being_served": being_served,
+            "total_served": len(self.served),
+            "active_counters": len(self.active_tellers),
+            "avg_wait_time": round(avg_wait, 1),
+            "sla_compliance": round(sla_pct, 1),
+            **{f"wait_{k}": round(v, 1) if v is not None else 0
+               for k, v in self.wait_sketches.percentiles().items()},
+            "queue_velocity": queue_velocity
+        }
+
+    def waiting_wait(self, customer: dict) -> float:
+        """Minutes a queued customer has waited so far"""
+        return (self.current_time - customer["wait_start"]).total_seconds() / 60
+
+    def service_breakdown(self) -> dict:
+        """Waiting count and average wait per service, services with nobody waiting left out"""
+        breakdown = {}
+        for customer in self.queue:
+            entry = breakdown.setdefault(customer["service"], [0, 0.0])
+            entry[0] += 1
+            entry[1] += self.waiting_wait(customer)
+        return {
+            service: {"count": breakdown[service][0], "avg_wait": round(breakdown[service][1] / breakdown[service][0], 1)}
+            for service in self.services if service in breakdown
+        }
+
+    def current_state(self, label=""):
+        """Build the snapshot dict for the current time without recording it"""
+        return {
+            "label": label,
+            "time": self.current_time.strftime("%H:%M"),
+            **self.metrics(),
+            "service_breakdown": self.service_breakdown(),
+            "waiting_customers": [
+                {
+                    "ticket": c["ticket"],
+                    "name": c["name"],
+                    "service": c["service"],
+                    "wait_time": round(self.waiting_wait(c), 1)
+                }
+                for c in self.queue
+            ],
+            "active_tellers": [
+                {
+                    "id": t["id"],
+                    "name": t["name"],
+                    "status": "busy" if t["current_customer"] else "available",
+                    "current_ticket": t["current_customer"]["ticket"] if t["current_customer"] else None,
+                    "total_served": t["total_served"]
+                }
+                for t in self.active_tellers.values()
+            ]
+        }
+
+    def take_snapshot(self, label=""):
+        """Record the current state in self.snapshots (delta-encoded if configured)"""
+        snapshot = self.current_state(label)
+        if self.snapshot_encoder:
+            wait_starts = {c["ticket"]: c["wait_start"] for c in self.queue}
+            self.snapshots.append(self.snapshot_encoder.encode(snapshot, self.current_time, wait_starts))
+        else:
+            self.snapshots.append(snapshot)
+        return snapshot
+
+    def full_snapshots(self):
+        """Iterate the recorded snapshots as full dicts, whatever the snapshot mode"""
+        if self.snapshot_encoder:
+            from snapshot_delta import decode
+            return decode(self.snapshots)
+        return iter(self.snapshots)
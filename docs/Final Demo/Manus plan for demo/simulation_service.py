@@ -0,0 +1,432 @@
+"""
+BleSaf Simulation Service
+Local HTTP/JSON service for the api/worker apps and the dashboards: scenario
+simulations and calendar forecasts run on a bounded process pool, "what if
+I open a counter now" is answered analytically (Erlang C) without a pool
+round-trip. Results are cached by request hash and identical requests in
+flight share one computation
+
+    python simulation_service.py --port 8766 --workers 2
+    curl -X POST localhost:8766/what-if -d '{"waiting": 18, "open_counters": 2, "arrival_rate": 40}'
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait
+from datetime import date, timedelta
+
+from simulation_core import SLA_THRESHOLD
+
+CACHE_ENTRIES = 1024
+MAX_PENDING = 32         # pool jobs queued or running before new ones get 503
+MAX_SEEDS = 50           # replications per /simulate request
+MAX_FORECAST_DAYS = 92
+MAX_BODY = 64 * 1024
+WHAT_IF_OPTIONS = 3      # counters added, by default, to the /what-if comparison
+MAX_WHAT_IF_OPTIONS = 10
+MAX_COUNTERS = 200       # erlang_c is O(counters) and /what-if runs on the event loop
+MAX_HOLIDAYS = 366
+
+# Scenarios /simulate may run, by name; clients never pass paths
+SCENARIOS = {"demo": os.path.join(os.path.dirname(os.path.abspath(__file__)), "demo_scenario.json")}
+# Sweep axis -> (low, high, cast) accepted in a /simulate point
+POINT_BOUNDS = {
+    "counters": (1, MAX_COUNTERS, int),
+    "arrival_scale": (0, 10, float),
+    "efficiency": (0.1, 10, float)
+}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+class ResultCache:
+    """LRU of encoded responses by request hash"""
+
+    def __init__(self, entries: int = CACHE_ENTRIES):
+        self.entries = entries
+        self.items = OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        body = self.items.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self.items.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key, body: bytes):
+        self.items[key] = body
+        self.items.move_to_end(key)
+        while len(self.items) > self.entries:
+            self.items.popitem(last=False)
+
+
+def request_key(endpoint: str, params: dict) -> str:
+    """Content address of a request: endpoint + canonical parameters + simulator code version"""
+    from parameter_sweep import code_version
+    blob = json.dumps({"endpoint": endpoint, "params": params, "code": code_version()},
+                      sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+# === Analytic fast path ===
+
+def erlang_c(servers: int, load: float) -> float:
+    """Probability that an arrival waits in an M/M/c queue (load = arrival rate / service rate)"""
+    if servers <= 0 or load >= servers:
+        return 1.0
+    blocking = 1.0  # Erlang B by recurrence, stable for large c
+    for k in range(1, servers + 1):
+        blocking = load * blocking / (k + load * blocking)
+    return blocking / (1 - load / servers * (1 - blocking))
+
+
+def _number(body: dict, name: str, default, cast=float, low=0, high=math.inf):
+    value = body.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or (cast is int and value != int(value)):
+        raise BadRequest(f"{name} must be a number" if cast is float else f"{name} must be an integer")
+    if not low <= value <= high:
+        raise BadRequest(f"{name} must be >= {low}" if high == math.inf else f"{name} must be between {low} and {high}")
+    return cast(value)
+
+
+def _what_if_params(body: dict) -> dict:
+    """Validated /what-if parameters; bounded so the in-process fast path stays fast"""
+    params = {}
+    services = body.get("services")
+    if services is not None:
+        if not isinstance(services, dict) or not services:
+            raise BadRequest("services must be a non-empty object of service configs")
+        for name, props in services.items():
+            if not isinstance(props, dict):
+                raise BadRequest(f"service {name}: config must be an object")
+            if "avg_duration" in props:
+                _number(props, "avg_duration", None, low=1e-3)
+            else:
+                duration = props.get("duration")
+                if not (isinstance(duration, list) and len(duration) == 2
+                        and all(isinstance(v, (int, float)) and not isinstance(v, bool) and v > 0 for v in duration)):
+                    raise BadRequest(f"service {name}: needs avg_duration or duration [low, high]")
+            _number(props, "weight", props.get("frequency", 1))
+        params["services"] = services
+
+    queue = body.get("queue")
+    if queue is not None:
+        if not isinstance(queue, list) or not all(isinstance(service, str) for service in queue):
+            raise BadRequest("queue must be a list of service names")
+        params["queue"] = queue
+    else:
+        params["waiting"] = _number(body, "waiting", 0, int)
+    if "efficiency" in body:
+        params["efficiency"] = _number(body, "efficiency", None, low=1e-3, high=10)
+    params["open_counters"] = _number(body, "open_counters", 0, int, high=MAX_COUNTERS)
+    params["add_counters"] = _number(body, "add_counters", WHAT_IF_OPTIONS, int,
+                                     high=min(MAX_WHAT_IF_OPTIONS, MAX_COUNTERS - params["open_counters"]))
+    params["arrival_rate"] = _number(body, "arrival_rate", 0)
+    return params
+
+
+def what_if(params: dict) -> dict:
+    """Compare the current counters with 1..N more, from the live queue and arrival rate
+
+    A new arrival first waits for the present backlog to drain, then for
+    the steady-state M/M/c wait at the current arrival rate (Erlang C).
+    Raises BadRequest for parameters outside _what_if_params' bounds.
+    """
+    from enhanced_simulation import SERVICES, TELLERS
+    from sla_predictor import expected_minutes
+
+    params = _what_if_params(params)
+    services = params.get("services") or SERVICES
+    work = {service: expected_minutes(props) for service, props in services.items()}
+    weights = {service: props.get("weight", props.get("frequency", 1)) for service, props in services.items()}
+    if not sum(weights.values()) > 0:
+        raise BadRequest("service weights must not all be zero")
+    mean_work = sum(work[s] * weights[s] for s in work) / sum(weights.values())
+
+    queue = params.get("queue")
+    if queue is not None:
+        unknown = set(queue) - set(work)
+        if unknown:
+            raise BadRequest(f"Unknown services in queue: {sorted(unknown)}")
+        backlog = sum(work[service] for service in queue)
+        waiting = len(queue)
+    else:
+        waiting = params["waiting"]
+        backlog = waiting * mean_work
+    efficiency = params.get("efficiency", sum(t["efficiency"] for t in TELLERS.values()) / len(TELLERS))
+    open_counters = params["open_counters"]
+    arrivals = params["arrival_rate"] / 60  # customers per minute
+
+    options = []
+    for added in range(params["add_counters"] + 1):
+        counters = open_counters + added
+        rate = counters * efficiency / mean_work  # services per minute, all counters
+        option = {"counters": counters, "added": added, "utilization": None, "backlog_minutes": None,
+                  "expected_wait": None, "sla_compliance": 0.0, "queue_growth_per_hour": None}
+        if counters:
+            load = arrivals * mean_work / efficiency
+            option["utilization"] = round(100 * load / counters, 1)
+            option["backlog_minutes"] = round(backlog / (counters * efficiency), 1)
+        if counters and arrivals < rate:
+            waits = erlang_c(counters, arrivals * mean_work / efficiency)
+            drain = rate - arrivals
+            option["expected_wait"] = round(option["backlog_minutes"] + waits / drain, 1)
+            # P(wait <= SLA) for a new arrival, its clock starting after the backlog
+            slack = SLA_THRESHOLD - option["backlog_minutes"]
+            option["sla_compliance"] = round(100 * (1 - waits * math.exp(-drain * slack)), 1) if slack > 0 else 0.0
+        elif counters or arrivals:
+            option["queue_growth_per_hour"] = round(60 * (arrivals - rate), 1)
+        options.append(option)
+
+    enough = next((o for o in options if o["sla_compliance"] >= 90), None)
+    return {"waiting": waiting, "arrival_rate": round(arrivals * 60, 1), "mean_service": round(mean_work, 2),
+            "options": options, "counters_needed": enough["counters"] if enough else None}
+
+
+# === Pool jobs (module level, so worker processes can import them) ===
+
+def _simulate_job(point: dict, seeds: list, scenario: str) -> dict:
+    from parameter_sweep import build_config, run_point
+    from scenario import load_scenario
+
+    config = build_config(point, load_scenario(SCENARIOS[scenario]))
+    runs = [run_point(config, seed) for seed in seeds]
+    mean = {key: round(sum(run[key] for run in runs) / len(runs), 2) for key in runs[0]}
+    return {"point": point, "seeds": seeds, "mean": mean, "runs": runs}
+
+
+def _forecast_job(params: dict) -> dict:
+    from calendar_simulation import load_calendar, run_calendar
+
+    calendar = load_calendar()
+    calendar["extra_holidays"] = list(calendar["extra_holidays"]) + params["holidays"]
+    days = list(run_calendar(date.fromisoformat(params["start"]), date.fromisoformat(params["end"]), calendar,
+                             counters=params["counters"], seed=params["seed"], workers=1))
+    open_days = [d for d in days if d["open"]]
+    served = sum(d["served"] for d in open_days)
+    return {
+        "days": days,
+        "open_days": len(open_days),
+        "customers": sum(d["customers"] for d in open_days),
+        "sla_compliance": round(sum(d["sla_compliance"] * d["served"] for d in open_days) / served, 1) if served else None,
+        "peak_day": max(open_days, key=lambda d: d["customers"])["date"] if open_days else None
+    }
+
+
+def _simulate_params(body: dict) -> dict:
+    from enhanced_simulation import SERVICES
+
+    point = body.get("point", {})
+    if not isinstance(point, dict):
+        raise BadRequest("point must be an object of axis values")
+    checked = {}
+    for axis in point:
+        if axis.startswith("share:"):
+            if axis[len("share:"):] not in SERVICES:
+                raise BadRequest(f"Unknown service for share axis: {axis[len('share:'):]}")
+            checked[axis] = _number(point, axis, None, high=1)
+        elif axis in POINT_BOUNDS:
+            low, high, cast = POINT_BOUNDS[axis]
+            checked[axis] = _number(point, axis, None, cast, low=low, high=high)
+        else:
+            raise BadRequest(f"Unknown axis: {axis}")
+    seeds = body.get("seeds")
+    if seeds is None:
+        # Count checked before the list exists: the event loop never allocates an unbounded range
+        seeds = list(range(_number(body, "replications", 1, int, low=1, high=MAX_SEEDS)))
+    elif not isinstance(seeds, list) or not 1 <= len(seeds) <= MAX_SEEDS:
+        raise BadRequest(f"1 to {MAX_SEEDS} seeds per request")
+    seeds = [_number({"seed": seed}, "seed", None, int, low=-math.inf) for seed in seeds]
+    scenario = body.get("scenario", "demo")
+    if scenario not in SCENARIOS:
+        raise BadRequest(f"scenario must be one of {sorted(SCENARIOS)}")
+    return {"point": checked, "seeds": seeds, "scenario": scenario}
+
+
+def _date(body: dict, name: str, default: date = None) -> date:
+    if name not in body and default is not None:
+        return default
+    try:
+        return date.fromisoformat(body.get(name))
+    except (TypeError, ValueError):
+        raise BadRequest(f"{name} must be a YYYY-MM-DD date")
+
+
+def _forecast_params(body: dict) -> dict:
+    from enhanced_simulation import TELLERS
+
+    start = _date(body, "start", date.today())
+    end = _date(body, "end", start + timedelta(days=6))
+    if not 0 <= (end - start).days < MAX_FORECAST_DAYS:
+        raise BadRequest(f"end must follow start by less than {MAX_FORECAST_DAYS} days")
+    counters = body.get("counters")
+    if counters is not None:
+        counters = _number(body, "counters", None, int, low=1, high=len(TELLERS))
+    holidays = body.get("holidays", [])
+    if not isinstance(holidays, list) or len(holidays) > MAX_HOLIDAYS:
+        raise BadRequest(f"holidays must be a list of at most {MAX_HOLIDAYS} dates")
+    holidays = [_date({"holiday": day}, "holiday").isoformat() for day in holidays]
+    return {"start": start.isoformat(), "end": end.isoformat(), "counters": counters,
+            "seed": _number(body, "seed", 0, int, low=-math.inf), "holidays": holidays}
+
+
+class SimulationService:
+    """Request hashing, caching, coalescing and admission control around the pool"""
+
+    # endpoint -> (parameter normalizer, pool job or None for the in-process fast path)
+    ENDPOINTS = {
+        "/simulate": (_simulate_params, lambda p: (_simulate_job, p["point"], p["seeds"], p["scenario"])),
+        "/forecast": (_forecast_params, lambda p: (_forecast_job, p)),
+        "/what-if": (_what_if_params, None)
+    }
+
+    def __init__(self, workers: int = None, cache_entries: int = CACHE_ENTRIES, max_pending: int = MAX_PENDING):
+        self.workers = workers or max(1, (os.cpu_count() or 2) // 2)  # leave the host cores to the apps
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        # Start the workers now, before the server accepts anything: workers
+        # forked later would inherit the client sockets open at that moment,
+        # and those connections would never see EOF once we close them
+        wait([self.executor.submit(os.getpid) for _ in range(self.workers)])
+        self.cache = ResultCache(cache_entries)
+        self.in_flight = {}  # request key -> future of the encoded body
+        self.max_pending = max_pending
+        self.coalesced = 0
+        self.rejected = 0
+
+    async def compute(self, endpoint: str, body: dict):
+        """(status, encoded body, how it was served: hit / miss / coalesced / fast)"""
+        normalize, job = self.ENDPOINTS[endpoint]
+        params = normalize(body)
+        key = request_key(endpoint, params)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            return 200, cached, "hit"
+        if key in self.in_flight:
+            self.coalesced += 1
+            return 200, await asyncio.shield(self.in_flight[key]), "coalesced"
+
+        if job is None:
+            result = _encode(what_if(params))
+            self.cache.put(key, result)
+            return 200, result, "fast"
+
+        if len(self.in_flight) >= self.max_pending:
+            self.rejected += 1
+            return 503, _encode({"error": "busy, retry shortly"}), "rejected"
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.in_flight[key] = future
+        try:
+            function, *args = job(params)
+            result = _encode(await loop.run_in_executor(self.executor, function, *args))
+            self.cache.put(key, result)
+            future.set_result(result)
+            return 200, result, "miss"
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # marks it retrieved even when nobody was waiting on it
+            raise
+        finally:
+            del self.in_flight[key]
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "in_flight": len(self.in_flight), "max_pending": self.max_pending,
+                "cache_entries": len(self.cache.items), "cache_hits": self.cache.hits,
+                "cache_misses": self.cache.misses, "coalesced": self.coalesced, "rejected": self.rejected}
+
+    async def handle_client(self, reader, writer):
+        """Minimal HTTP: POST /simulate, /forecast, /what-if (JSON body), GET /health"""
+        try:
+            request = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            method, path = (request + ["", ""])[:2]
+            path = path.partition("?")[0]
+
+            if method == "OPTIONS":
+                status, body, served = 204, b"", "preflight"
+            elif method == "GET" and path == "/health":
+                status, body, served = 200, _encode(self.stats()), "fast"
+            elif method == "POST" and path in self.ENDPOINTS:
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY:
+                    raise BadRequest("request body too large")
+                raw = await reader.readexactly(length) if length else b"{}"
+                try:
+                    status, body, served = await self.compute(path, json.loads(raw))
+                except (ValueError, TypeError, KeyError) as exc:
+                    status, body, served = 400, _encode({"error": str(exc)}), "error"
+            else:
+                status, body, served = 404, _encode({"error": "not found"}), "error"
+            await _respond(writer, status, body, served)
+        except ValueError as exc:  # bad request line, headers or size
+            await _respond(writer, 400, _encode({"error": str(exc)}), "error")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as exc:  # a failed job must not take the service down
+            await _respond(writer, 500, _encode({"error": f"{type(exc).__name__}: {exc}"}), "error")
+        finally:
+            writer.close()
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+_REASONS = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error",
+            503: "Service Unavailable"}
+
+
+def _encode(payload) -> bytes:
+    return json.dumps(payload, default=str).encode("utf-8")
+
+
+async def _respond(writer, status: int, body: bytes, served: str):
+    head = (f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nX-Cache: {served}\r\nConnection: close\r\n"
+            "Access-Control-Allow-Origin: *\r\nAccess-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+            "Access-Control-Allow-Headers: Content-Type\r\n")
+    if status == 503:
+        head += "Retry-After: 1\r\n"
+    writer.write(head.encode("latin-1") + b"\r\n" + body)
+    await writer.drain()
+
+
+async def serve(host="127.0.0.1", port=8766, **kwargs):
+    service = SimulationService(**kwargs)
+    server = await asyncio.start_server(service.handle_client, host, port)
+    print(f"Simulation service on http://{host}:{port} ({service.workers} workers)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local simulation service for the apps and dashboards")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--workers", type=int, help="pool processes (default: half the CPUs)")
+    parser.add_argument("--max-pending", type=int, default=MAX_PENDING)
+    parser.add_argument("--cache-entries", type=int, default=CACHE_ENTRIES)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers, max_pending=args.max_pending,
+                          cache_entries=args.cache_entries))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,261 @@
+"""
+BleSaf SLA Breach Predictor
+Online early warning: an event-log observer that keeps, for every waiting
+ticket, the expected wait implied by its queue position, the service mix
+ahead of it and the open counters, and raises an alert as soon as the
+projected SLA compliance of the day drops below a threshold
+
+    python sla_predictor.py --branches 300
+"""
+
+import math
+from bisect import bisect_left, insort
+
+from simulation_core import SLA_THRESHOLD
+
+ALERT_THRESHOLD = 90  # projected SLA %, the dashboards' warning line
+ALERT_MARGIN = 2      # points above the threshold before an alert clears
+MIN_CUSTOMERS = 10    # no alert while fewer customers make up the projection
+
+
+def expected_minutes(props: dict) -> float:
+    """Mean service duration of a service config, either simulator's format"""
+    if "avg_duration" in props:
+        return props["avg_duration"]
+    low, high = props["duration"]
+    return (low + high) / 2
+
+
+class SlaPredictor:
+    """Incremental breach projection, fed one event at a time
+
+    Work is counted in service minutes at efficiency 1.0 and the open
+    counters drain it at the sum of their efficiencies. With FIFO service
+    the work ahead of a ticket is (work enqueued before it) - (work dequeued
+    so far), so each arrival stores one offset and every estimate is O(1).
+    A ticket breaches if arrival + SLA < now + (work ahead + work left at
+    the counters) / capacity; rearranged, its per-ticket side is a constant
+    key, kept in a sorted list so the tickets at risk are counted with one
+    bisect. Keys are rebuilt only when a counter opens or closes.
+    """
+
+    def __init__(self, services: dict, tellers: dict, threshold: float = ALERT_THRESHOLD,
+                 sla_minutes: float = SLA_THRESHOLD, margin: float = ALERT_MARGIN,
+                 min_customers: int = MIN_CUSTOMERS, on_alert=None):
+        self.work = {service: expected_minutes(props) for service, props in services.items()}
+        self.mean_work = sum(self.work.values()) / len(self.work)
+        self.efficiency = {teller_id: config["efficiency"] for teller_id, config in tellers.items()}
+        self.threshold = threshold
+        self.sla_minutes = sla_minutes
+        self.margin = margin
+        self.min_customers = min_customers
+        self.on_alert = on_alert
+
+        self.origin = None
+        self.capacity = 0.0      # sum of the open counters' efficiencies
+        self.busy_capacity = 0.0
+        self.end_work = 0.0      # sum of efficiency * expected end over the services in progress
+        self.serving = {}        # teller_id -> (efficiency, expected end, within SLA)
+        self.enqueued = 0.0      # cumulative work of every arrival
+        self.dequeued = 0.0      # cumulative work of every ticket that left the queue
+        self.waiting = {}        # customer_id -> [arrival, work enqueued before it, work, key]
+        self.keys = []           # sorted (key, customer_id)
+        self.served = self.served_ok = 0
+        self.in_service = self.in_service_ok = 0
+
+        self.projected_sla = 100.0
+        self.at_risk = 0
+        self.alerting = False
+        self.alerts = []
+
+    def _minutes(self, time) -> float:
+        return (time - self.origin).total_seconds() / 60
+
+    # Incremental state
+
+    def _key(self, arrival: float, before: float) -> float:
+        return (arrival + self.sla_minutes) * self.capacity - before
+
+    def _rekey(self):
+        for entry in self.waiting.values():
+            entry[3] = self._key(entry[0], entry[1])
+        self.keys = sorted((entry[3], customer_id) for customer_id, entry in self.waiting.items())
+
+    def _enqueue(self, customer_id, service: str, arrival: float):
+        work = self.work.get(service, self.mean_work)
+        key = self._key(arrival, self.enqueued)
+        self.waiting[customer_id] = [arrival, self.enqueued, work, key]
+        insort(self.keys, (key, customer_id))
+        self.enqueued += work
+
+    def _dequeue(self, customer_id) -> float:
+        entry = self.waiting.pop(customer_id, None)
+        if entry is None:
+            return self.mean_work
+        del self.keys[bisect_left(self.keys, (entry[3], customer_id))]
+        self.dequeued += entry[2]
+        return entry[2]
+
+    def _start(self, teller_id: str, work: float, start: float, within_sla: bool):
+        efficiency = self.efficiency[teller_id]
+        end = start + work / efficiency
+        self.serving[teller_id] = (efficiency, end, within_sla)
+        self.busy_capacity += efficiency
+        self.end_work += efficiency * end
+        self.in_service += 1
+        self.in_service_ok += within_sla
+
+    def _complete(self, teller_id: str):
+        if teller_id not in self.serving:
+            return
+        efficiency, end, within_sla = self.serving.pop(teller_id)
+        self.busy_capacity -= efficiency
+        self.end_work -= efficiency * end
+        self.in_service -= 1
+        self.in_service_ok -= within_sla
+        self.served += 1
+        self.served_ok += within_sla
+
+    def _open(self, teller_id: str, sign: int):
+        self.capacity += sign * self.efficiency[teller_id]
+        if self.capacity < 1e-9:
+            self.capacity = 0.0
+        self._rekey()
+
+    def sync(self, sim):
+        """Start from a simulator's current state (queue, counters, served so far)"""
+        self.origin = sim.current_time
+        self.served = len(sim.served)
+        self.served_ok = sim.sla_met
+        for teller_id, teller in sim.active_tellers.items():
+            self.capacity += self.efficiency[teller_id]
+            customer = teller["current_customer"]
+            if customer is not None:
+                self._start(teller_id, self.work.get(customer["service"], self.mean_work),
+                            self._minutes(customer["service_start"]), customer["wait_time"] <= self.sla_minutes)
+        for customer in sim.queue:
+            self._enqueue(customer["id"], customer["service"], self._minutes(customer["wait_start"]))
+        self.evaluate(0.0)
+
+    def __call__(self, sim, event: dict):
+        """Observer entry point (BranchSimulator.observers)"""
+        kind = event["type"]
+        if kind == "arrival":
+            self._enqueue(event["customer_id"], event["service"], self._minutes(event["time"]))
+        elif kind == "service_start":
+            work = self._dequeue(event["customer_id"])
+            self._start(event["teller_id"], work, self._minutes(event["time"]), event["wait_time"] <= self.sla_minutes)
+        elif kind == "service_complete":
+            self._complete(event["teller_id"])
+        elif kind == "teller_activated":
+            self._open(event["teller_id"], 1)
+        elif kind == "teller_deactivated":
+            self._open(event["teller_id"], -1)
+        else:
+            return  # our own alerts and anything else do not move the projection
+        if self.evaluate(self._minutes(sim.current_time)):
+            self._alert(sim)
+
+    # Projection
+
+    def backlog(self, now: float) -> float:
+        """Work still ahead of the head of the queue: the rest of the services in progress"""
+        return max(0.0, self.end_work - now * self.busy_capacity)
+
+    def expected_wait(self, customer_id, now: float) -> float:
+        """Projected total wait (minutes) of a waiting ticket, O(1)"""
+        arrival, before, _, _ = self.waiting[customer_id]
+        if not self.capacity:
+            return math.inf
+        ahead = before - self.dequeued + self.backlog(now)
+        return now - arrival + max(0.0, ahead) / self.capacity
+
+    def expected_waits(self, sim) -> dict:
+        """{ticket: projected wait} for the current queue"""
+        now = self._minutes(sim.current_time)
+        return {c["ticket"]: round(self.expected_wait(c["id"], now), 1)
+                for c in sim.queue if c["id"] in self.waiting}
+
+    def evaluate(self, now: float) -> bool:
+        """Update the projection at time now; True when the alert state changes"""
+        waiting = len(self.waiting)
+        if not self.capacity:
+            self.at_risk = waiting
+        else:
+            limit = now * self.capacity - self.dequeued + self.backlog(now)
+            self.at_risk = bisect_left(self.keys, (limit,))
+        total = self.served + self.in_service + waiting
+        within = self.served_ok + self.in_service_ok + waiting - self.at_risk
+        self.projected_sla = 100 * within / total if total else 100.0
+
+        if not self.alerting and self.projected_sla < self.threshold and total >= self.min_customers:
+            self.alerting = True
+            return True
+        if self.alerting and self.projected_sla >= self.threshold + self.margin:
+            self.alerting = False
+            return True
+        return False
+
+    def _alert(self, sim):
+        now = self._minutes(sim.current_time)
+        newest = next(reversed(self.waiting), None)
+        alert = {
+            "time": sim.current_time,
+            "type": "sla_alert",
+            "status": "raised" if self.alerting else "cleared",
+            "projected_sla": round(self.projected_sla, 1),
+            "at_risk": self.at_risk,
+            "queue_length": len(self.waiting),
+            "open_counters": len(sim.active_tellers),
+            "newest_expected_wait": round(self.expected_wait(newest, now), 1) if newest is not None else 0
+        }
+        self.alerts.append(alert)
+        sim.log_event(alert)
+        if self.on_alert is not None:
+            self.on_alert(sim, alert)
+
+
+def attach(sim, threshold: float = ALERT_THRESHOLD, **kwargs) -> SlaPredictor:
+    """Create a predictor for a simulator, synced to its current state, and register it"""
+    predictor = SlaPredictor(sim.services, sim.tellers, threshold, **kwargs)
+    predictor.sync(sim)
+    sim.observers.append(predictor)
+    return predictor
+
+
+if __name__ == "__main__":
+    import argparse
+    import random
+    import time
+
+    from enhanced_simulation import EnhancedSimulator
+    from scenario import DEMO_SCENARIO_PATH, compile_scenario, load_scenario, run_scenario
+
+    parser = argparse.ArgumentParser(description="Run the demo scenario on many branches with the SLA predictor")
+    parser.add_argument("--branches", type=int, default=300)
+    parser.add_argument("--threshold", type=float, default=ALERT_THRESHOLD)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    def run(predict: bool):
+        random.seed(args.seed)
+        branches = [EnhancedSimulator() for _ in range(args.branches)]
+        compiled = compile_scenario(load_scenario(DEMO_SCENARIO_PATH), branches[0].services)
+        predictors = [attach(sim, args.threshold) for sim in branches] if predict else []
+        started = time.perf_counter()
+        # Branches advance together, minute by minute, as a live network would
+        for minute in range(compiled.duration + 1):
+            for sim in branches:
+                run_scenario(sim, compiled, start_minute=minute, end_minute=minute, verbose=False)
+        return time.perf_counter() - started, branches, predictors
+
+    baseline, _, _ = run(False)
+    elapsed, branches, predictors = run(True)
+    events = sum(len(sim.events) for sim in branches)
+    alerted = [p for p in predictors if p.alerts]
+    print(f"{args.branches} branches, {events} events: {baseline:.2f}s without, {elapsed:.2f}s with the predictor "
+          f"({1e6 * (elapsed - baseline) / events:.1f} us/event)")
+    print(f"{len(alerted)} branches alerted")
+    for alert in predictors[0].alerts:
+        print(f"  {alert['time'].strftime('%H:%M')} {alert['status']:7} projected SLA {alert['projected_sla']:5}%  "
+              f"{alert['at_risk']} at risk of {alert['queue_length']} waiting, newest ticket ~{alert['newest_expected_wait']} min")
@@ -0,0 +1,132 @@
+"""
+BleSaf Delta Snapshots
+Stores snapshots as changes since the previous one (tickets added/removed,
+teller changes, changed metrics) with periodic keyframes for random access
+"""
+
+from datetime import datetime
+
+METRICS = ("queue_length", "being_served", "total_served", "active_counters",
+           "avg_wait_time", "sla_compliance", "wait_p50", "wait_p90", "wait_p99", "queue_velocity")
+
+
+class DeltaSnapshotEncoder:
+    """Turns a stream of full snapshots into keyframes and deltas
+
+    Waiting tickets are stored with their wait_start, not their wait_time:
+    wait times change every minute for every waiting customer, wait_start
+    never does, and decoding recomputes wait_time exactly like the simulator.
+    """
+
+    def __init__(self, keyframe_every: int = 60):
+        self.keyframe_every = keyframe_every
+        self.count = 0
+        self.prev = None
+
+    def encode(self, snapshot: dict, timestamp: datetime, wait_starts: dict) -> dict:
+        """Encode one snapshot; wait_starts maps each waiting ticket to its wait_start"""
+        waiting = {
+            c["ticket"]: (c["name"], c["service"], wait_starts[c["ticket"]].isoformat())
+            for c in snapshot["waiting_customers"]
+        }
+        tellers = {t["id"]: t for t in snapshot["active_tellers"]}
+        state = {
+            "metrics": {k: snapshot[k] for k in METRICS},
+            "breakdown": snapshot["service_breakdown"],
+            "waiting": waiting,
+            "tellers": tellers
+        }
+        entry = {"label": snapshot["label"], "time": snapshot["time"], "timestamp": timestamp.isoformat()}
+
+        if self.prev is None or self.count % self.keyframe_every == 0:
+            entry["keyframe"] = True
+            entry["metrics"] = state["metrics"]
+            entry["breakdown"] = state["breakdown"]
+            entry["waiting"] = [[ticket, *values] for ticket, values in waiting.items()]
+            entry["tellers"] = list(tellers.values())
+        else:
+            prev = self.prev
+            metrics = {k: v for k, v in state["metrics"].items() if prev["metrics"][k] != v}
+            if metrics:
+                entry["metrics"] = metrics
+
+            if state["breakdown"] != prev["breakdown"]:
+                entry["breakdown"] = state["breakdown"]
+
+            removed = [t for t in prev["waiting"] if t not in waiting]
+            added = [[t, *v] for t, v in waiting.items() if t not in prev["waiting"]]
+            if removed:
+                entry["removed"] = removed
+            if added:
+                entry["added"] = added
+
+            changed = {}
+            for tid, teller in tellers.items():
+                before = prev["tellers"].get(tid)
+                if before is None:
+                    changed[tid] = teller
+                else:
+                    diff = {k: v for k, v in teller.items() if before[k] != v}
+                    if diff:
+                        changed[tid] = diff
+            if changed:
+                entry["tellers"] = changed
+            gone = [tid for tid in prev["tellers"] if tid not in tellers]
+            if gone:
+                entry["tellers_removed"] = gone
+
+        self.prev = state
+        self.count += 1
+        return entry
+
+
+def _wait_time(timestamp, wait_start):
+    return round((timestamp - datetime.fromisoformat(wait_start)).total_seconds() / 60, 1)
+
+
+def decode(entries, start: int = 0):
+    """Yield full snapshots from the entry at `start` (which must be a keyframe)"""
+    waiting = tellers = metrics = breakdown = None
+    for entry in entries[start:]:
+        if entry.get("keyframe"):
+            metrics = dict(entry["metrics"])
+            breakdown = entry["breakdown"]
+            waiting = {w[0]: w[1:] for w in entry["waiting"]}
+            tellers = {t["id"]: dict(t) for t in entry["tellers"]}
+        else:
+            if waiting is None:
+                raise ValueError("Delta decoding must start at a keyframe")
+            metrics.update(entry.get("metrics", {}))
+            breakdown = entry.get("breakdown", breakdown)
+            for ticket in entry.get("removed", []):
+                del waiting[ticket]
+            for w in entry.get("added", []):
+                waiting[w[0]] = w[1:]
+            for tid in entry.get("tellers_removed", []):
+                del tellers[tid]
+            for tid, diff in entry.get("tellers", {}).items():
+                if tid in tellers:
+                    tellers[tid] = dict(tellers[tid], **diff)
+                else:
+                    tellers[tid] = dict(diff)
+
+        timestamp = datetime.fromisoformat(entry["timestamp"])
+        snapshot = {"label": entry["label"], "time": entry["time"]}
+        snapshot.update(metrics)
+        snapshot["service_breakdown"] = breakdown
+        snapshot["waiting_customers"] = [
+            {"ticket": ticket, "name": name, "service": service, "wait_time": _wait_time(timestamp, wait_start)}
+            for ticket, (name, service, wait_start) in waiting.items()
+        ]
+        snapshot["active_tellers"] = [dict(t) for t in tellers.values()]
+        yield snapshot
+
+
+def snapshot_at(entries, index: int) -> dict:
+    """Random access: decode forward from the nearest keyframe at or before index"""
+    key = index
+    while not entries[key].get("keyframe"):
+        key -= 1
+    for offset, snapshot in enumerate(decode(entries, key)):
+        if key + offset == index:
+            return snapshot
@@ -0,0 +1,31 @@
+"""
+Tests for the scenario compiler's arrival draws
+
+    python -m pytest test_scenario.py
+"""
+
+import random
+
+import pytest
+
+from scenario import POISSON_CHUNK, _poisson
+
+
+@pytest.fixture
+def seeded():
+    state = random.getstate()
+    random.seed(0)
+    yield
+    random.setstate(state)
+
+
+@pytest.mark.parametrize("rate", [0.5, 12, POISSON_CHUNK + 1, 1_000_000 / 480])
+def test_poisson_mean_matches_rate(seeded, rate):
+    # Large rates once drew at most ~745 (exp() underflow), silently capping the load
+    draws = 2000
+    mean = sum(_poisson(rate) for _ in range(draws)) / draws
+    assert mean == pytest.approx(rate, rel=0.05 if rate < 10 else 0.01)
+
+
+def test_poisson_zero_rate():
+    assert _poisson(0) == 0
@@ -0,0 +1,134 @@
+"""
+BleSaf Time Series
+Per-minute metric series for long runs, pre-aggregated into min/max/mean
+buckets (minute, 15 min, hour, day) stored next to the raw series, plus
+LTTB downsampling so charts never draw more points than they can show
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from snapshot_delta import METRICS
+
+RESOLUTIONS = {"minute": "1min", "15min": "15min", "hour": "1h", "day": "1D"}
+AGGREGATES = ("min", "max", "mean")
+SERIES_STEM = "demo_series"
+MAX_POINTS = 600  # about one point per pixel column of a 12-inch chart at screen resolution
+
+
+class MinuteSeries:
+    """Records the numeric metrics at the end of every simulated minute
+
+    Pass it as run_scenario's on_minute hook. Values are kept as plain
+    column lists (cheap to append, cheap to pickle with a checkpoint).
+    """
+
+    def __init__(self, metrics=METRICS):
+        self.metrics = tuple(metrics)
+        self.times = []
+        self.columns = {name: [] for name in self.metrics}
+
+    def __call__(self, sim, minute: int):
+        values = sim.metrics()
+        self.times.append(sim.current_time)
+        for name in self.metrics:
+            self.columns[name].append(values[name])
+
+    def __len__(self):
+        return len(self.times)
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns, index=pd.DatetimeIndex(self.times, name="Time"))
+
+
+def aggregate(frame: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """min/max/mean of every column per bucket; columns are named <metric>_<aggregate>"""
+    buckets = frame.resample(rule).agg(list(AGGREGATES)).dropna(how="all")
+    buckets.columns = [f"{metric}_{agg}" for metric, agg in buckets.columns]
+    return buckets
+
+
+def write_series(frame: pd.DataFrame, output_dir: str, stem: str = SERIES_STEM) -> list:
+    """Write the raw series and every resolution, with an index of their sizes
+
+    Files are <stem>.csv (raw), <stem>_<resolution>.csv and <stem>_index.json,
+    which lets a chart pick a resolution without reading the larger files.
+    """
+    paths = [os.path.join(output_dir, f"{stem}.csv")]
+    frame.to_csv(paths[0])
+    index = {"raw": len(frame), "start": str(frame.index[0]) if len(frame) else None,
+             "end": str(frame.index[-1]) if len(frame) else None, "resolutions": {}}
+    for name, rule in RESOLUTIONS.items():
+        buckets = aggregate(frame, rule)
+        path = os.path.join(output_dir, f"{stem}_{name}.csv")
+        buckets.to_csv(path)
+        index["resolutions"][name] = len(buckets)
+        paths.append(path)
+
+    paths.append(os.path.join(output_dir, f"{stem}_index.json"))
+    with open(paths[-1], "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    return paths
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Indices of the points kept by Largest-Triangle-Three-Buckets
+
+    Keeps the first and last points and, from each of points - 2 equal
+    buckets in between, the one forming the largest triangle with the point
+    kept before it and the mean of the next bucket: peaks and dips survive,
+    flat stretches collapse.
+    """
+    n = len(y)
+    if points >= n or points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+
+    kept = np.empty(points, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[hi:next_hi].mean()
+        next_y = y[hi:next_hi].mean()
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def downsample(frame: pd.DataFrame, metric: str, max_points: int = MAX_POINTS) -> pd.DataFrame:
+    """At most max_points rows of a series, picked by LTTB on one of its columns"""
+    if len(frame) <= max_points:
+        return frame
+    x = frame.index.asi8 if isinstance(frame.index, pd.DatetimeIndex) else np.arange(len(frame))
+    return frame.iloc[lttb(x, frame[metric].to_numpy(), max_points)]
+
+
+def load_for_chart(data_dir: str, metric: str, max_points: int = MAX_POINTS,
+                   stem: str = SERIES_STEM) -> pd.DataFrame:
+    """Time, mean, min and max of a metric at the finest stored resolution that fits
+
+    Reads the raw series when it is short enough (min = max = mean); falls
+    back to LTTB over the daily means when even those are too many.
+    """
+    with open(os.path.join(data_dir, f"{stem}_index.json"), encoding="utf-8") as f:
+        index = json.load(f)
+
+    if index["raw"] <= max_points:
+        raw = pd.read_csv(os.path.join(data_dir, f"{stem}.csv"), usecols=["Time", metric],
+                          index_col="Time", parse_dates=["Time"])
+        return pd.DataFrame({agg: raw[metric] for agg in ("mean", "min", "max")})
+
+    name = next((name for name, rows in index["resolutions"].items() if rows <= max_points), "day")
+    columns = [f"{metric}_{agg}" for agg in AGGREGATES]
+    buckets = pd.read_csv(os.path.join(data_dir, f"{stem}_{name}.csv"), usecols=["Time"] + columns,
+                          index_col="Time", parse_dates=["Time"])
+    buckets.columns = list(AGGREGATES)
+    return downsample(buckets, "mean", max_points)